@@ -3,7 +3,19 @@
 # Description: Provided data structures necessary to complete the assignment.
 #              Please look through this file carefully to see what methods
 #              are available and how they're implemented.
-#              Don't modify the contents of this file.
+#              Beyond the original data structures and sample hash functions,
+#              it now also holds the hashing helpers shared by the hash maps:
+#              extra hash functions, batch hashing, the HASH_FUNCTIONS
+#              registry, and chain walks that use cached hashes. Hash values
+#              are part of the saved file formats, so changing a registered
+#              hash function makes existing files unreadable.
+
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:     # batch hashing falls back to pure Python
+    np = None
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -80,22 +92,129 @@ class DynamicArray:
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
-    hash = 0
-    for letter in key:
-        hash += ord(letter)
-    return hash
+    # sum of the character ordinals; ASCII keys are summed directly from their bytes
+    if key.isascii():
+        return sum(key.encode())
+    return sum(map(ord, key))
 
 
 def hash_function_2(key: str) -> int:
     """Sample Hash function #2 to be used with HashMap implementation"""
-    hash, index = 0, 0
-    index = 0
-    for letter in key:
-        hash += (index + 1) * ord(letter)
-        index += 1
+    # sum of (index + 1) * ord(letter), computed as the sum of the running totals of the reversed key
+    if key.isascii():
+        return sum(accumulate(key.encode()[::-1]))
+    return sum(accumulate(map(ord, reversed(key))))
+
+
+# ---- Stronger hash functions (64 bit, over the key's UTF-8 bytes) ---- #
+
+FNV_OFFSET_BASIS = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+MASK_64 = (1 << 64) - 1
+
+
+def hash_function_fnv1a(key: str) -> int:
+    """64 bit FNV-1a hash: xor in each byte, then multiply by the FNV prime."""
+    hash = FNV_OFFSET_BASIS
+    for byte in key.encode():
+        hash = ((hash ^ byte) * FNV_PRIME) & MASK_64
     return hash
 
 
+def _mix_64(value: int) -> int:
+    """SplitMix64 finalizer: spread every input bit over the whole 64 bit result."""
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & MASK_64
+    return value ^ (value >> 31)
+
+
+def hash_function_mix64(key: str) -> int:
+    """64 bit multiply-xorshift hash: mixes the key eight bytes at a time with the SplitMix64 finalizer."""
+    data = key.encode()
+    hash = len(data)
+    for start in range(0, len(data), 8):
+        word = int.from_bytes(data[start:start + 8], 'little')
+        hash = _mix_64(((hash ^ word) + 0x9e3779b97f4a7c15) & MASK_64)
+    return _mix_64(hash)
+
+
+def to_list(values) -> list:
+    """Return the values as a list; accepts any iterable as well as a DynamicArray."""
+    if isinstance(values, DynamicArray):
+        return [values[index] for index in range(values.length())]
+    return list(values)
+
+
+def _code_points(keys: list):
+    """
+    Decode a list of keys into one NumPy array of code points.
+    Return the code points along with the length and start offset of every key. Lone surrogates are kept as
+    their own code points, as ord() sees them.
+    """
+    codes = np.frombuffer(''.join(keys).encode('utf-32-le', 'surrogatepass'), dtype='<u4').astype(np.int64)
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    starts = np.cumsum(lengths) - lengths
+    return codes, lengths, starts
+
+
+def _segment_sums(values, lengths, starts) -> list:
+    """Sum each key's segment of a flat array using a single cumulative sum."""
+    totals = np.concatenate((np.zeros(1, dtype=np.int64), np.cumsum(values)))
+    return (totals[starts + lengths] - totals[starts]).tolist()
+
+
+def hash_function_1_batch(keys) -> list:
+    """Return hash_function_1 of every key, vectorized with NumPy when it is installed."""
+    keys = to_list(keys)
+    if np is None or not keys:
+        return [hash_function_1(key) for key in keys]
+    codes, lengths, starts = _code_points(keys)
+    return _segment_sums(codes, lengths, starts)
+
+
+def hash_function_2_batch(keys) -> list:
+    """Return hash_function_2 of every key, vectorized with NumPy when it is installed."""
+    keys = to_list(keys)
+    if np is None or not keys:
+        return [hash_function_2(key) for key in keys]
+    codes, lengths, starts = _code_points(keys)
+    # fall back to Python integers if the position-weighted sums could overflow int64
+    if codes.size and int(codes.max()) * int((lengths * (lengths + 1) // 2).sum()) >= 2 ** 62:
+        return [hash_function_2(key) for key in keys]
+    positions = np.arange(codes.size, dtype=np.int64) - np.repeat(starts, lengths) + 1
+    return _segment_sums(codes * positions, lengths, starts)
+
+
+def batch_hash(function, keys) -> list:
+    """
+    Hash many keys at once with the given hash function.
+    The sample hash functions use their vectorized batch versions, any other function is applied key by key.
+    """
+    if function is hash_function_1:
+        return hash_function_1_batch(keys)
+    if function is hash_function_2:
+        return hash_function_2_batch(keys)
+    return [function(key) for key in to_list(keys)]
+
+
+# hash functions that files may name, so a table written by one process can be probed by another. Python's built-in
+# hash() is salted per process and can never be registered.
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'hash_function_fnv1a': hash_function_fnv1a,
+    'hash_function_mix64': hash_function_mix64,
+}
+
+
+def hash_function_name(function) -> str:
+    """Return the name a registered hash function is saved under; raise ValueError for any other function."""
+    for name, registered in HASH_FUNCTIONS.items():
+        if registered is function:
+            return name
+    raise ValueError(f"hash function {function!r} is not registered in HASH_FUNCTIONS")
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +222,12 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None) -> None:
+        """Initialize node given a key, value and (optionally) the key's full hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -141,7 +261,7 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, put, update, remove, pop, contains, find, items, length, iterator
     """
 
     def __init__(self) -> None:
@@ -168,39 +288,113 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at the front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def put(self, key: str, value: object, hash: int = None) -> bool:
+        """
+        Update the value of the node with matching key, or insert a new node at the front if there is none.
+        Return True if a node was inserted, False if one was updated.
+        """
+        node = self.contains(key, hash)
+        if node is None:
+            self.insert(key, value, hash)
+            return True
+        node.value = value
+        return False
+
+    def update(self, key: str, function: callable, hash: int = None) -> (object, bool):
+        """
+        Replace the value of the node with matching key by function(value). If there is none, insert a node holding
+        function(None) at the front unless that is None.
+        Return (the new value, True if the key was already in the list).
+        """
+        node = self.contains(key, hash)
+        if node is not None:
+            node.value = function(node.value)
+            return node.value, True
+        value = function(None)
+        if value is not None:
+            self.insert(key, value, hash)
+        return value, False
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If a hash is given, nodes with a different cached hash are skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
+        return self.pop(key, hash) is not None
+
+    def pop(self, key: str, hash: int = None) -> SLNode:
+        """
+        Remove first node with matching key and return it, or None if no match.
+        If a hash is given, nodes with a different cached hash are skipped without comparing keys.
+        """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If a hash is given, nodes with a different cached hash are skipped without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
 
+    def find(self, key: str, hash: int = None, reorder: str = None) -> (SLNode, int):
+        """
+        Return (node with matching key or None, number of nodes compared).
+        With reorder set to 'move_to_front' a found node is moved to the head of the list,
+        with 'transpose' it swaps places with the node before it.
+        """
+        before, previous, node = None, None, self._head
+        comparisons = 0
+        while node:
+            comparisons += 1
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous is not None and reorder == 'move_to_front':
+                    previous.next = node.next
+                    node.next = self._head
+                    self._head = node
+                elif previous is not None and reorder == 'transpose':
+                    previous.next = node.next
+                    node.next = previous
+                    if before:
+                        before.next = node
+                    else:
+                        self._head = node
+                return node, comparisons
+            before, previous, node = previous, node, node.next
+        return None, comparisons
+
+    def items(self):
+        """Return a generator over the (key, value) tuples, starting at the head."""
+        return ((node.key, node.value) for node in self)
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
@@ -210,10 +404,11 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """Initialize an entry for use in a hash map, caching the key's full hash."""
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
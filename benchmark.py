@@ -0,0 +1,322 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Reproducible benchmark suite for the separate chaining (SC) and open addressing (OA) hash maps.
+#              Times each workload over several key distributions, hash functions, initial capacities and sizes,
+#              writes the results as JSON and compares them against a saved baseline so regressions fail the run.
+#
+# Usage:       python benchmark.py --output results.json
+#              python benchmark.py --save-baseline baseline.json
+#              python benchmark.py --baseline baseline.json --tolerance 0.25
+#              python benchmark.py --memory --baseline baseline.json --memory-tolerance 0.1
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tracemalloc
+from itertools import permutations
+from time import perf_counter
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import HASH_FUNCTIONS, DynamicArray
+
+SEED = 261
+
+
+# ------------------- KEY DISTRIBUTIONS ------------------------------------ #
+
+def sequential_keys(count: int, offset: int = 0) -> list:
+    """Keys of the form 'str' + i, as used by the PDF examples."""
+    return ['str' + str(i) for i in range(offset, offset + count)]
+
+
+def random_keys(count: int, offset: int = 0) -> list:
+    """Random lowercase keys of 6 to 16 letters, reproducible for a given offset."""
+    generator = random.Random(SEED + offset)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(generator.choices(letters, k=generator.randint(6, 16))))
+    return sorted(keys)
+
+
+def anagram_keys(count: int, offset: int = 0) -> list:
+    """Permutations of a few fixed words, so hash_function_1 collides on whole groups of keys."""
+    keys = []
+    for word in ('abcdefgh', 'ijklmnop', 'qrstuvwx', 'bcdefghi', 'jklmnopq'):
+        for letters in permutations(word):
+            keys.append(''.join(letters))
+    random.Random(SEED).shuffle(keys)
+    return keys[offset:offset + count]
+
+
+KEY_SETS = {
+    'sequential': sequential_keys,
+    'random': random_keys,
+    'anagram': anagram_keys,
+}
+
+MAPS = {
+    'sc': lambda capacity, function: hash_map_sc.HashMap(capacity, function),
+    'sc_array': lambda capacity, function: hash_map_sc.HashMap(capacity, function, chain='array'),
+    'oa': lambda capacity, function: hash_map_oa.HashMap(capacity, function),
+}
+
+
+# ------------------- WORKLOADS -------------------------------------------- #
+# Each workload takes (make, keys, misses) and returns (setup, operation). setup() runs untimed before every repeat
+# and its result is passed to operation(), which is the part that gets timed.
+
+def _filled(make, keys):
+    """Return a setup function that builds a map holding every key."""
+    def setup():
+        hash_map = make()
+        for key in keys:
+            hash_map.put(key, key)
+        return hash_map
+    return setup
+
+
+def workload_put(make, keys, misses):
+    """Insert every key into an empty map, including all the resizes on the way."""
+    def operation(hash_map):
+        for key in keys:
+            hash_map.put(key, key)
+    return make, operation
+
+
+def workload_get_hit(make, keys, misses):
+    """Look up every key that is in the map."""
+    def operation(hash_map):
+        for key in keys:
+            hash_map.get(key)
+    return _filled(make, keys), operation
+
+
+def workload_get_miss(make, keys, misses):
+    """Look up keys that are not in the map."""
+    def operation(hash_map):
+        for key in misses:
+            hash_map.get(key)
+    return _filled(make, keys), operation
+
+
+def workload_remove(make, keys, misses):
+    """Remove every key from a full map."""
+    def operation(hash_map):
+        for key in keys:
+            hash_map.remove(key)
+    return _filled(make, keys), operation
+
+
+def workload_churn(make, keys, misses):
+    """Remove a key, insert a new one and look both up, for every key: a session store style workload."""
+    def operation(hash_map):
+        for old, new in zip(keys, misses):
+            hash_map.remove(old)
+            hash_map.put(new, new)
+            hash_map.get(old)
+            hash_map.get(new)
+    return _filled(make, keys), operation
+
+
+def workload_resize(make, keys, misses):
+    """Double the capacity of a full map once."""
+    def operation(hash_map):
+        hash_map.resize_table(hash_map.get_capacity() * 2)
+    return _filled(make, keys), operation
+
+
+def workload_iterate(make, keys, misses):
+    """Iterate over every entry of a full map."""
+    def operation(hash_map):
+        for _ in hash_map:
+            pass
+    return _filled(make, keys), operation
+
+
+def workload_keys_and_values(make, keys, misses):
+    """Export every pair of a full map with get_keys_and_values()."""
+    def operation(hash_map):
+        hash_map.get_keys_and_values()
+    return _filled(make, keys), operation
+
+
+def workload_find_mode(make, keys, misses):
+    """Run find_mode over the keys with every third key repeated."""
+    values = keys + keys[::3]
+
+    def setup():
+        return DynamicArray(values)
+
+    def operation(array):
+        hash_map_sc.find_mode(array)
+    return setup, operation
+
+
+WORKLOADS = {
+    'put': workload_put,
+    'get_hit': workload_get_hit,
+    'get_miss': workload_get_miss,
+    'remove': workload_remove,
+    'churn': workload_churn,
+    'resize': workload_resize,
+    'iterate': workload_iterate,
+    'get_keys_and_values': workload_keys_and_values,
+    'find_mode': workload_find_mode,
+}
+
+
+# workloads that build their own map instead of calling make(), with the hash function name and capacity that map
+# always uses; they run once per key set and size instead of once per hash function and capacity
+OWN_MAP_WORKLOADS = {
+    'find_mode': ('hash_function_1', 11),
+}
+
+
+def supported(map_name: str, workload: str) -> bool:
+    """Return True if the workload applies to the map."""
+    if workload == 'find_mode':
+        return map_name == 'sc'
+    return True
+
+
+def variants(workload: str, hashes, capacities) -> list:
+    """Return the (hash function name, capacity) pairs the workload is measured with."""
+    if workload in OWN_MAP_WORKLOADS:
+        return [OWN_MAP_WORKLOADS[workload]]
+    return [(hash_name, capacity) for hash_name in hashes for capacity in capacities]
+
+
+# ------------------- RUNNER ----------------------------------------------- #
+
+def measure(setup, operation, repeats: int, memory: bool) -> dict:
+    """
+    Time the operation after a fresh setup, keeping the fastest of the repeats.
+    If memory is set, one more untimed run records the peak memory the operation allocated.
+    """
+    times = []
+    for _ in range(repeats):
+        state = setup()
+        start = perf_counter()
+        operation(state)
+        times.append(perf_counter() - start)
+    result = {'seconds': min(times), 'median_seconds': sorted(times)[len(times) // 2]}
+    if memory:
+        state = setup()
+        tracemalloc.start()
+        operation(state)
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def case_id(case: dict) -> str:
+    """Return the identifier a result is matched on when comparing with a baseline."""
+    return '{map}/{workload}/{keys}/{hash}/cap={capacity}/n={size}'.format(**case)
+
+
+def run_suite(maps, workloads, key_sets, hashes, capacities, sizes, repeats: int, memory: bool) -> list:
+    """Run every combination of the given options and return one result dict per case."""
+    results = []
+    for size in sizes:
+        for key_set in key_sets:
+            keys = KEY_SETS[key_set](size)
+            misses = KEY_SETS[key_set](size, offset=size)
+            for map_name in maps:
+                for workload in workloads:
+                    if not supported(map_name, workload):
+                        continue
+                    for hash_name, capacity in variants(workload, hashes, capacities):
+                        case = {'map': map_name, 'workload': workload, 'keys': key_set, 'hash': hash_name,
+                                'capacity': capacity, 'size': len(keys)}
+
+                        def make(map_name=map_name, capacity=capacity, hash_name=hash_name):
+                            return MAPS[map_name](capacity, HASH_FUNCTIONS[hash_name])
+
+                        setup, operation = WORKLOADS[workload](make, keys, misses)
+                        case.update(measure(setup, operation, repeats, memory))
+                        case['id'] = case_id(case)
+                        results.append(case)
+                        print(f"{case['id']:<70} {case['seconds']:.6f}s", file=sys.stderr)
+    return results
+
+
+def compare(results: list, baseline: list, tolerance: float, min_delta: float, memory_tolerance: float = 0.1,
+            min_bytes: int = 4096) -> list:
+    """
+    Compare results with a baseline run.
+    Return a list of (id, metric, baseline value, value) for every case slower than the baseline by more than the
+    tolerance (a fraction) and by more than min_delta seconds, and, when both runs recorded memory, for every case
+    whose peak_bytes grew by more than memory_tolerance and by more than min_bytes.
+    """
+    previous = {case['id']: case for case in baseline}
+    regressions = []
+    for case in results:
+        old = previous.get(case['id'])
+        if old is None:
+            continue
+        if case['seconds'] > old['seconds'] * (1 + tolerance) and case['seconds'] - old['seconds'] > min_delta:
+            regressions.append((case['id'], 'seconds', old['seconds'], case['seconds']))
+        if 'peak_bytes' in case and 'peak_bytes' in old:
+            if (case['peak_bytes'] > old['peak_bytes'] * (1 + memory_tolerance)
+                    and case['peak_bytes'] - old['peak_bytes'] > min_bytes):
+                regressions.append((case['id'], 'peak_bytes', old['peak_bytes'], case['peak_bytes']))
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Parse the command line, run the suite and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Benchmark the SC and OA hash maps.")
+    parser.add_argument('--maps', nargs='+', default=list(MAPS), choices=list(MAPS))
+    parser.add_argument('--workloads', nargs='+', default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument('--keys', nargs='+', default=list(KEY_SETS), choices=list(KEY_SETS))
+    parser.add_argument('--hashes', nargs='+', default=['hash_function_1', 'hash_function_2'],
+                        choices=list(HASH_FUNCTIONS))
+    parser.add_argument('--capacities', nargs='+', type=int, default=[11])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 5000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--memory', action='store_true', help="also record peak allocated bytes per case")
+    parser.add_argument('--output', help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument('--save-baseline', help="write the results to this baseline file")
+    parser.add_argument('--baseline', help="compare against this baseline file and fail on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown as a fraction")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="ignore slowdowns below this many seconds")
+    parser.add_argument('--memory-tolerance', type=float, default=0.1,
+                        help="allowed peak memory growth as a fraction, when both runs used --memory")
+    parser.add_argument('--min-bytes', type=int, default=4096, help="ignore peak memory growth below this many bytes")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.maps, args.workloads, args.keys, args.hashes, args.capacities, args.sizes,
+                        args.repeats, args.memory)
+    report = {'python': platform.python_version(), 'platform': platform.platform(), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    elif not args.save_baseline:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.tolerance, args.min_delta, args.memory_tolerance,
+                              args.min_bytes)
+        for identifier, metric, old, new in regressions:
+            if metric == 'seconds':
+                print(f"REGRESSION {identifier}: {old:.6f}s -> {new:.6f}s", file=sys.stderr)
+            else:
+                print(f"REGRESSION {identifier}: {old} -> {new} peak bytes", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
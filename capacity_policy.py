@@ -0,0 +1,196 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Capacity policy shared by both hash maps. Prime checks and prime searches are table lookups into a
+#              precomputed sieve (with a deterministic Miller-Rabin test past the end of the sieve), and a policy
+#              object decides how capacities are rounded and how fast a map grows.
+
+from bisect import bisect_left
+from math import ceil
+
+# primes below this limit are looked up in the sieve
+SIEVE_LIMIT = 1 << 17
+
+
+def _sieve(limit: int) -> bytearray:
+    """Return a bytearray where index i is 1 if i is prime."""
+    sieve = bytearray([1]) * limit
+    sieve[0] = sieve[1] = 0
+    for factor in range(2, int(limit ** 0.5) + 1):
+        if sieve[factor]:
+            sieve[factor * factor::factor] = bytes(len(range(factor * factor, limit, factor)))
+    return sieve
+
+
+_IS_PRIME = _sieve(SIEVE_LIMIT)
+# odd primes only, since capacities are always rounded up to an odd number first
+_ODD_PRIMES = [number for number in range(3, SIEVE_LIMIT, 2) if _IS_PRIME[number]]
+
+# well spaced primes, each roughly double the last and far from a power of two
+PRIME_LADDER = (
+    3, 7, 13, 29, 53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593, 49157, 98317, 196613, 393241, 786433,
+    1572869, 3145739, 6291469, 12582917, 25165843, 50331653, 100663319, 201326611, 402653189, 805306457,
+    1610612741, 3221225473, 6442450939, 12884901893, 25769803799, 51539607551, 103079215111, 206158430209,
+)
+
+# a progressive resize visits at most this many empty buckets per bucket it moves, as in Redis
+REHASH_EMPTY_VISITS = 10
+
+# Miller-Rabin bases that make the test deterministic for every n < 3.3 * 10 ** 24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def is_prime(capacity: int) -> bool:
+    """
+    Determine if given integer is a prime number and return boolean.
+    Small numbers are looked up in the sieve, larger ones use a deterministic Miller-Rabin test.
+    """
+    if capacity < SIEVE_LIMIT:
+        return capacity > 1 and _IS_PRIME[capacity] == 1
+    if capacity % 2 == 0:
+        return False
+    d, s = capacity - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for witness in _WITNESSES:
+        x = pow(witness, d, capacity)
+        if x == 1 or x == capacity - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % capacity
+            if x == capacity - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime that is >= the given number.
+    Matches the original trial division search: even numbers are bumped to the next odd number first.
+    """
+    if capacity < _ODD_PRIMES[-1]:
+        return _ODD_PRIMES[bisect_left(_ODD_PRIMES, capacity)]
+    if capacity % 2 == 0:
+        capacity += 1
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def next_power_of_two(capacity: int) -> int:
+    """Return the smallest power of two that is >= the given number (and at least 2)."""
+    return max(2, 1 << (capacity - 1).bit_length())
+
+
+class CapacityPolicy:
+    """
+    Decides the capacities a hash map may have, the load factors it grows and shrinks at and by how much.
+    Supported modes are:
+    prime   - the smallest prime >= the requested capacity (the original behaviour)
+    ladder  - the next prime on PRIME_LADDER, so resizes always land on well spaced primes
+    pow2    - the next power of two, so bucket indices can be computed with a mask instead of a modulo.
+              Only use this with hash functions whose low bits are well mixed.
+    A map grows by growth_factor once its load factor reaches max_load (1.0 for separate chaining and 0.5 for open
+    addressing when left as None). With min_load set, a remove that leaves the load factor below it shrinks the map
+    by shrink_factor. hysteresis keeps a gap on both sides so a map never shrinks straight back to the edge of
+    growing, or grows straight back to the edge of shrinking: a shrink never raises the load factor above
+    (1 - hysteresis) * max_load, and min_load must stay below the load right after a grow by the same margin.
+    """
+
+    MODES = ('prime', 'ladder', 'pow2')
+
+    def __init__(self, mode: str = 'prime', growth_factor: float = 2, max_load: float = None, min_load: float = None,
+                 shrink_factor: float = 2, hysteresis: float = 0.25) -> None:
+        """Initialize a policy with a capacity mode, the resize factors and the load factor limits."""
+        if mode not in self.MODES:
+            raise ValueError(f"unknown capacity mode {mode!r}, expected one of {self.MODES}")
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if shrink_factor <= 1:
+            raise ValueError("shrink_factor must be greater than 1")
+        if max_load is not None and max_load <= 0:
+            raise ValueError("max_load must be greater than 0")
+        if min_load is not None and min_load <= 0:
+            raise ValueError("min_load must be greater than 0")
+        if not 0 <= hysteresis < 1:
+            raise ValueError("hysteresis must be at least 0 and less than 1")
+        self.mode = mode
+        self.growth_factor = growth_factor
+        self.max_load = max_load
+        self.min_load = min_load
+        self.shrink_factor = shrink_factor
+        self.hysteresis = hysteresis
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return f"CapacityPolicy(mode={self.mode}, growth_factor={self.growth_factor}, max_load={self.max_load}, " \
+               f"min_load={self.min_load}, shrink_factor={self.shrink_factor}, hysteresis={self.hysteresis})"
+
+    def load_limits(self, default_max_load: float) -> (float, float):
+        """
+        Return (max load, min load) for a map whose own maximum load factor is default_max_load. The min load is 0
+        when the policy never shrinks. Raises ValueError if min_load is too close to the load factor a map is left
+        with right after growing.
+        """
+        max_load = self.max_load if self.max_load is not None else default_max_load
+        if self.min_load is None:
+            return max_load, 0.0
+        if self.min_load >= (1 - self.hysteresis) * max_load / self.growth_factor:
+            raise ValueError(f"min_load must be below (1 - hysteresis) * max_load / growth_factor = "
+                             f"{(1 - self.hysteresis) * max_load / self.growth_factor:g}")
+        return max_load, self.min_load
+
+    def round(self, capacity: int) -> int:
+        """Return the capacity a table asked to hold the given number of buckets should have."""
+        if self.mode == 'pow2':
+            return next_power_of_two(capacity)
+        if self.mode == 'ladder':
+            index = bisect_left(PRIME_LADDER, capacity)
+            if index < len(PRIME_LADDER):
+                return PRIME_LADDER[index]
+            return next_prime(capacity)
+        if is_prime(capacity):
+            return capacity
+        return next_prime(capacity)
+
+    def initial(self, capacity: int) -> int:
+        """
+        Return the capacity a new table asked for the given number of buckets should have. Like round, except that
+        prime mode always picks an odd prime, as the original constructors did.
+        """
+        if self.mode == 'prime':
+            return next_prime(capacity)
+        return self.round(capacity)
+
+    def grow(self, capacity: int) -> int:
+        """Return the (unrounded) capacity to grow a table of the given capacity to."""
+        return max(capacity + 1, int(capacity * self.growth_factor))
+
+    def shrink(self, capacity: int, size: int, max_load: float) -> int:
+        """
+        Return the capacity to shrink a table of the given capacity and size to: the capacity divided by
+        shrink_factor, but never so small that the load factor would rise above (1 - hysteresis) * max_load.
+        The result is rounded, and is the current capacity when the table cannot shrink.
+        """
+        target = max(int(capacity / self.shrink_factor), ceil(size / ((1 - self.hysteresis) * max_load)), 1)
+        return min(capacity, self.round(target))
+
+    def mask(self, capacity: int):
+        """Return the bit mask that replaces the modulo for this capacity, or None when the modulo is needed."""
+        if self.mode == 'pow2':
+            return capacity - 1
+        return None
+
+
+def snapshot_policy(policy: CapacityPolicy, pow2: bool) -> CapacityPolicy:
+    """
+    Return the policy for a map loaded from a saved table: the given policy, or a pow2 or prime one by default.
+    Raises ValueError if the given policy would take indices differently from the saved table.
+    """
+    if policy is None:
+        return CapacityPolicy('pow2' if pow2 else 'prime')
+    if (policy.mode == 'pow2') != pow2:
+        raise ValueError(f"{policy} does not match a table saved {'with' if pow2 else 'without'} pow2 capacities")
+    return policy
@@ -0,0 +1,193 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Multi-threaded stress test and throughput benchmark for ConcurrentHashMap. The stress test hammers a
+#              small, constantly resizing map with atomic counters and put_if_absent from many threads and checks the
+#              totals. The benchmark compares a striped map with the separate chaining HashMap behind one global lock.
+#
+# Usage:       python concurrent_benchmark.py --threads 1 2 4 8
+#              python concurrent_benchmark.py --stress-only
+
+import argparse
+import json
+import random
+import sys
+import threading
+from time import perf_counter
+
+import hash_map_sc
+from concurrent_hash_map import ConcurrentHashMap
+from a6_include import hash_function_mix64
+
+SEED = 261
+
+
+class GlobalLockMap:
+    """
+    The separate chaining HashMap behind a single lock, as a baseline for the striped map.
+    Supported methods are: put, get, remove, compute, put_if_absent, get_size
+    """
+
+    def __init__(self, capacity: int, function: callable) -> None:
+        """Initialize an empty map and its lock."""
+        self._map = hash_map_sc.HashMap(capacity, function)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        """Add or update a pair under the lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        """Return the value of a key under the lock."""
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key: str) -> None:
+        """Remove a key under the lock."""
+        with self._lock:
+            self._map.remove(key)
+
+    def compute(self, key: str, function: callable) -> object:
+        """Replace the value of a key with function(key, value) under the lock; None removes the key."""
+        with self._lock:
+            value = function(key, self._map.get(key))
+            if value is None:
+                self._map.remove(key)
+            else:
+                self._map.put(key, value)
+            return value
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """Add a pair unless the key is present; return the existing value or None."""
+        with self._lock:
+            if self._map.contains_key(key):
+                return self._map.get(key)
+            self._map.put(key, value)
+
+    def get_size(self) -> int:
+        """Return the number of pairs."""
+        with self._lock:
+            return self._map.get_size()
+
+
+MAPS = {
+    'striped': lambda capacity, stripes: ConcurrentHashMap(capacity, hash_function_mix64, stripes),
+    'global': lambda capacity, stripes: GlobalLockMap(capacity, hash_function_mix64),
+}
+
+
+def run_threads(count: int, target) -> float:
+    """Run target(thread number) on the given number of threads at once and return the wall clock seconds taken."""
+    barrier = threading.Barrier(count + 1)
+
+    def worker(number):
+        barrier.wait()
+        target(number)
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = perf_counter()
+    for thread in threads:
+        thread.join()
+    return perf_counter() - start
+
+
+def increment(key: str, value: object) -> int:
+    """compute() function that counts calls."""
+    return 1 if value is None else value + 1
+
+
+def stress(map_name: str, threads: int, operations: int, stripes: int) -> None:
+    """
+    Check that concurrent compute, put_if_absent, put and remove calls lose no updates while the map keeps resizing.
+    Raises AssertionError on the first inconsistency.
+    """
+    hash_map = MAPS[map_name](2, stripes)
+    counters = ['counter' + str(number) for number in range(32)]
+    winners = [0] * threads
+
+    def target(number):
+        generator = random.Random(SEED + number)
+        for step in range(operations):
+            hash_map.compute(generator.choice(counters), increment)
+            # only the first thread to claim a key wins it
+            if hash_map.put_if_absent('claim' + str(step), number) is None:
+                winners[number] += 1
+            # private keys make the table grow while the other threads work
+            hash_map.put('own' + str(number) + '-' + str(step), step)
+            if step % 3 == 0:
+                hash_map.remove('own' + str(number) + '-' + str(step))
+
+    run_threads(threads, target)
+    assert sum(hash_map.get(key) or 0 for key in counters) == threads * operations, "lost compute updates"
+    assert sum(winners) == operations, "put_if_absent admitted a key twice"
+    for step in range(operations):
+        assert hash_map.get('claim' + str(step)) is not None
+    kept = sum(1 for step in range(operations) if step % 3 != 0)
+    expected = len([key for key in counters if hash_map.get(key) is not None]) + operations + threads * kept
+    assert hash_map.get_size() == expected, f"size {hash_map.get_size()} != {expected}"
+
+
+def throughput(map_name: str, threads: int, operations: int, keys: int, read_ratio: float, stripes: int) -> dict:
+    """
+    Time a mixed workload of gets (read_ratio of the operations), puts and removes over a shared key space.
+    Return the case as a dict with the operations per second.
+    """
+    hash_map = MAPS[map_name](16, stripes)
+    names = ['key' + str(number) for number in range(keys)]
+    for name in names[::2]:
+        hash_map.put(name, 0)
+
+    def target(number):
+        generator = random.Random(SEED + number)
+        for step in range(operations):
+            key = generator.choice(names)
+            choice = generator.random()
+            if choice < read_ratio:
+                hash_map.get(key)
+            elif choice < (1 + read_ratio) / 2:
+                hash_map.put(key, step)
+            else:
+                hash_map.remove(key)
+
+    seconds = run_threads(threads, target)
+    return {'map': map_name, 'threads': threads, 'operations': threads * operations, 'seconds': seconds,
+            'operations_per_second': threads * operations / seconds}
+
+
+def main(argv=None) -> int:
+    """Parse the command line, run the stress test and the benchmark and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Stress test and benchmark ConcurrentHashMap.")
+    parser.add_argument('--maps', nargs='+', default=list(MAPS), choices=list(MAPS))
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 2, 4, 8])
+    parser.add_argument('--operations', type=int, default=20000, help="operations per thread")
+    parser.add_argument('--keys', type=int, default=10000, help="size of the shared key space")
+    parser.add_argument('--read-ratio', type=float, default=0.8)
+    parser.add_argument('--stripes', type=int, default=16)
+    parser.add_argument('--stress-only', action='store_true', help="only run the stress test")
+    parser.add_argument('--output', help="write the benchmark results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    for map_name in args.maps:
+        stress(map_name, max(args.threads), args.operations // 10, args.stripes)
+        print(f"stress {map_name}: ok", file=sys.stderr)
+    if args.stress_only:
+        return 0
+
+    results = []
+    print(f"{'map':<10}{'threads':>8}{'ops/s':>14}")
+    for threads in args.threads:
+        for map_name in args.maps:
+            case = throughput(map_name, threads, args.operations, args.keys, args.read_ratio, args.stripes)
+            results.append(case)
+            print(f"{map_name:<10}{threads:>8}{case['operations_per_second']:>14.0f}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'python': sys.version, 'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
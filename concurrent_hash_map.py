@@ -0,0 +1,345 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Thread-safe separate chaining hash map with lock striping. Every bucket belongs to one of a fixed number
+#              of stripes, each guarded by its own lock, so threads working on keys in different stripes never wait
+#              for each other. Resizes take every stripe lock. Includes the atomic put_if_absent and compute.
+
+import threading
+from time import perf_counter
+
+from capacity_policy import CapacityPolicy, next_power_of_two
+from map_views import ItemsView, KeysView, ValuesView
+from sc_buckets import CHAINS, EMPTY_BUCKET
+from a6_include import DynamicArray, LinkedList, hash_function_1
+
+
+class ConcurrentHashMap:
+    """
+    Separate chaining hash map that can be shared between threads.
+    The capacity and the number of stripes are powers of two and a key's stripe is hash & (stripes - 1), so all the
+    keys of a bucket share one stripe however often the table is resized. Every operation on a key holds only the
+    lock of its stripe; resizes and clear hold all of them.
+    Iteration, keys(), values() and items() are weakly consistent: they visit one stripe at a time under its lock and
+    may or may not see changes made to other stripes meanwhile.
+    """
+
+    def __init__(self,
+                 capacity: int = 16,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 chain: str = 'linked') -> None:
+        """
+        Initialize a new ConcurrentHashMap with at least the given capacity and number of stripes, both rounded up to
+        powers of two. The capacity is never smaller than the number of stripes.
+        The chain type is 'linked' or 'array', as for the separate chaining HashMap.
+        """
+        if chain not in CHAINS:
+            raise ValueError(f"unknown chain type {chain!r}, expected one of {tuple(CHAINS)}")
+        if stripes < 1:
+            raise ValueError(f"stripes must be at least 1, got {stripes!r}")
+        self._chain = CHAINS[chain]
+        self._policy = CapacityPolicy('pow2')
+        self._hash_function = function
+
+        self._stripes = next_power_of_two(stripes)
+        self._stripe_mask = self._stripes - 1
+        self._locks = [threading.Lock() for _ in range(self._stripes)]
+        # number of keys in each stripe, only changed under that stripe's lock
+        self._counts = [0] * self._stripes
+
+        self._capacity = self._policy.initial(max(capacity, self._stripes))
+        self._mask = self._policy.mask(self._capacity)
+        self._buckets = DynamicArray([EMPTY_BUCKET] * self._capacity)
+        self._last_resize_time = 0.0
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Exact when no other thread is changing the map.
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_stripes(self) -> int:
+        """
+        Return the number of lock stripes
+        """
+        return self._stripes
+
+    def table_load(self) -> float:
+        """
+        Returns the current table load factor.
+
+        :return: A float representing the load factor.
+        """
+        return self.get_size() / self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_all(self) -> None:
+        """
+        Acquires every stripe lock, always in the same order so concurrent resizes cannot deadlock.
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Releases every stripe lock.
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def _bucket(self, hash: int):
+        """
+        Returns the bucket of a hash, allocating it if needed. Must be called with the hash's stripe lock held.
+
+        :param hash: The full hash of a key.
+
+        :return: The bucket's chain.
+        """
+        index = hash & self._mask
+        llist = self._buckets[index]
+        if llist is EMPTY_BUCKET:
+            llist = self._buckets[index] = self._chain()
+        return llist
+
+    def _grow_if_needed(self) -> None:
+        """
+        Doubles the capacity once the load factor reaches 1. Called after an insert, without any lock held.
+        """
+        capacity = self._capacity
+        if self.get_size() >= capacity:
+            self._resize(capacity * 2, capacity)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds a key/value pair into the hash map. If a key already exists in the hash map, the value is updated.
+        Doubles the capacity once the load factor reaches 1.
+
+        :param key: A string that is hashed and is the key for a value.
+        :param value: Any object that will represent the value in the key/value pair.
+        """
+        hash = self._hash_function(key)
+        stripe = hash & self._stripe_mask
+        with self._locks[stripe]:
+            inserted = self._bucket(hash).put(key, value, hash)
+            if inserted:
+                self._counts[stripe] += 1
+        if inserted:
+            self._grow_if_needed()
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Atomically adds a key/value pair unless the key is already in the hash map.
+
+        :param key: The key to add.
+        :param value: The value to add with it.
+
+        :return: The value already stored for the key, or None if the pair was added.
+        """
+        hash = self._hash_function(key)
+        stripe = hash & self._stripe_mask
+        with self._locks[stripe]:
+            node = self._buckets[hash & self._mask].contains(key, hash)
+            if node is not None:
+                return node.value
+            self._bucket(hash).insert(key, value, hash)
+            self._counts[stripe] += 1
+        self._grow_if_needed()
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Atomically replaces the value of a key with function(key, current value), where the current value is None if
+        the key is absent. A result of None removes the key. The function runs with the key's stripe locked, so it
+        must be short and must not use the hash map itself.
+
+        :param key: The key to update.
+        :param function: Called as function(key, value) to produce the new value.
+
+        :return: The new value, or None if the key was removed or stayed absent.
+        """
+        hash = self._hash_function(key)
+        stripe = hash & self._stripe_mask
+        inserted = False
+        with self._locks[stripe]:
+            index = hash & self._mask
+            llist = self._buckets[index]
+            node = llist.contains(key, hash)
+            value = function(key, None if node is None else node.value)
+            if value is None:
+                if node is not None:
+                    llist.remove(key, hash)
+                    self._counts[stripe] -= 1
+                    if llist.length() == 0:
+                        self._buckets[index] = EMPTY_BUCKET
+            elif node is None:
+                self._bucket(hash).insert(key, value, hash)
+                self._counts[stripe] += 1
+                inserted = True
+            else:
+                llist.put(key, value, hash)
+        if inserted:
+            self._grow_if_needed()
+        return value
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the passed key, or None if it is not in the hash map.
+
+        :param key: The string for a key to search for
+        """
+        hash = self._hash_function(key)
+        with self._locks[hash & self._stripe_mask]:
+            node = self._buckets[hash & self._mask].contains(key, hash)
+            return None if node is None else node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Check if the hash map contains a key.
+
+        :param key: The key to search for.
+
+        :return: True if found, false if not.
+        """
+        hash = self._hash_function(key)
+        with self._locks[hash & self._stripe_mask]:
+            return self._buckets[hash & self._mask].contains(key, hash) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a key/value pair from the hash map.
+
+        :param key: The key of the key/value pair to remove.
+        """
+        hash = self._hash_function(key)
+        stripe = hash & self._stripe_mask
+        with self._locks[stripe]:
+            index = hash & self._mask
+            llist = self._buckets[index]
+            if llist.remove(key, hash):
+                self._counts[stripe] -= 1
+                # release a bucket that became empty
+                if llist.length() == 0:
+                    self._buckets[index] = EMPTY_BUCKET
+
+    def clear(self) -> None:
+        """
+        Clears the hash map of all values but does not alter the capacity.
+        """
+        self._lock_all()
+        try:
+            self._buckets = DynamicArray([EMPTY_BUCKET] * self._capacity)
+            self._counts = [0] * self._stripes
+        finally:
+            self._unlock_all()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash map to at least the passed capacity, rounded up to a power of two that is no smaller than the
+        number of stripes and fits every entry under a load factor of 1. Blocks every other operation meanwhile.
+
+        :param new_capacity: An integer for the new capacity of the table.
+        """
+        self._resize(new_capacity, None)
+
+    def _resize(self, new_capacity: int, expected: int) -> None:
+        """
+        Rebuilds the table with every stripe locked, relinking the nodes by their cached hashes.
+
+        :param new_capacity: The requested capacity.
+        :param expected: If given, the capacity the caller saw; the resize is skipped if another thread changed it
+        first.
+        """
+        self._lock_all()
+        try:
+            if expected is not None and self._capacity != expected:
+                return
+            start = perf_counter()
+            size = sum(self._counts)
+            capacity = self._policy.round(max(new_capacity, self._stripes))
+            while size and (size - 1) / capacity >= 1.0:
+                capacity *= 2
+            original_map = self._buckets
+            buckets = DynamicArray([EMPTY_BUCKET] * capacity)
+            mask, chain = capacity - 1, self._chain
+            for index in range(original_map.length()):
+                llist = original_map[index]
+                if llist.length() == 0:
+                    continue
+                if type(llist) is LinkedList:
+                    # relink the nodes without copying them
+                    for node in llist:
+                        new_index = node.hash & mask
+                        if buckets[new_index] is EMPTY_BUCKET:
+                            buckets[new_index] = chain()
+                        buckets[new_index].insert_node(node)
+                else:
+                    for key, value, hash in llist.entries():
+                        new_index = hash & mask
+                        if buckets[new_index] is EMPTY_BUCKET:
+                            buckets[new_index] = chain()
+                        buckets[new_index].insert(key, value, hash)
+            self._buckets, self._capacity, self._mask = buckets, capacity, mask
+            self._last_resize_time = perf_counter() - start
+        finally:
+            self._unlock_all()
+
+    def get_last_resize_time(self) -> float:
+        """
+        Returns how long the most recent resize took, while every stripe was locked.
+
+        :return: The time in seconds, or 0.0 if the map has never been resized.
+        """
+        return self._last_resize_time
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Gets all the key/value pairs in the hash map.
+
+        :return: A dynamic array where each index contains a tuple for each key/value pair (key, value).
+        """
+        results = DynamicArray()
+        for pair in self._iter_items():
+            results.append(pair)
+        return results
+
+    def _iter_items(self):
+        """
+        Generates the (key, value) pairs one stripe at a time. Each stripe is copied under its lock, so the generator
+        holds no lock between pairs and other threads may use the map while it is consumed.
+        """
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                buckets = self._buckets
+                pairs = [pair for index in range(stripe, self._capacity, self._stripes)
+                         for pair in buckets[index].items()]
+            yield from pairs
+
+    def keys(self) -> KeysView:
+        """
+        Returns a lazy, weakly consistent view of the keys in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a lazy, weakly consistent view of the values in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a lazy, weakly consistent view of the (key, value) pairs in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self):
+        """
+        Returns a weakly consistent iterator over the (key, value) pairs of the hash map.
+        """
+        return self._iter_items()
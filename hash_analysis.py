@@ -0,0 +1,109 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Hash distribution analyzer. Runs a key corpus through a hash function for a given capacity and reports
+#              bucket occupancy, the longest separate chaining bucket, the longest open addressing probe and a
+#              chi-squared uniformity score, so hash functions can be chosen from measurements.
+#
+# Usage:       python hash_analysis.py [keys.txt] [--capacity 1009]
+
+import argparse
+from math import sqrt
+
+from a6_include import HASH_FUNCTIONS, batch_hash, to_list
+from probing import get_strategy
+
+
+def longest_probe(keys: list, hashes: list, capacity: int, probing='quadratic') -> int:
+    """
+    Insert the hashes into an empty open addressing table of the given capacity and return the most slots any
+    insert had to probe. Return None if the keys do not fit in the table.
+    """
+    if len(hashes) > capacity:
+        return None
+    strategy = get_strategy(probing)
+    occupied = bytearray(capacity)
+    longest = 0
+    for key, hash in zip(keys, hashes):
+        for probes, index in enumerate(strategy.probe(hash, key, capacity, None), 1):
+            if not occupied[index]:
+                occupied[index] = 1
+                longest = max(longest, probes)
+                break
+        else:
+            return None
+    return longest
+
+
+def analyze(keys, function: callable, capacity: int, probing='quadratic') -> dict:
+    """
+    Measure how evenly a hash function spreads a key corpus over a table of the given capacity.
+
+    :param keys: An iterable (or DynamicArray) of string keys.
+    :param function: The hash function to measure.
+    :param capacity: The number of buckets.
+    :param probing: The probe sequence used to measure the longest open addressing probe.
+
+    :return: A dict with the bucket occupancy, longest chain and probe, number of distinct full hashes, and the
+    chi-squared statistic with its normalized score (close to 1 for a uniform hash) and z-score.
+    """
+    keys = to_list(keys)
+    hashes = batch_hash(function, keys)
+    counts = [0] * capacity
+    for hash in hashes:
+        counts[hash % capacity] += 1
+
+    total = len(keys)
+    used = capacity - counts.count(0)
+    expected = total / capacity
+    degrees = capacity - 1
+    chi_squared = sum((count - expected) ** 2 for count in counts) / expected if total else 0.0
+    return {
+        'keys': total,
+        'capacity': capacity,
+        'distinct_hashes': len(set(hashes)),
+        'used_buckets': used,
+        'empty_buckets': capacity - used,
+        # buckets a uniform hash is expected to use for this many keys
+        'expected_used_buckets': capacity * (1 - (1 - 1 / capacity) ** total),
+        'max_chain_length': max(counts),
+        'max_probe_length': longest_probe(keys, hashes, capacity, probing),
+        'chi_squared': chi_squared,
+        'uniformity': chi_squared / degrees if degrees else 0.0,
+        'z_score': (chi_squared - degrees) / sqrt(2 * degrees) if degrees else 0.0,
+    }
+
+
+def compare(keys, capacity: int, functions: dict = None, probing='quadratic') -> dict:
+    """Analyze the same corpus with several hash functions (all known ones by default), keyed by name."""
+    keys = to_list(keys)
+    functions = functions if functions is not None else HASH_FUNCTIONS
+    return {name: analyze(keys, function, capacity, probing) for name, function in functions.items()}
+
+
+def print_report(results: dict) -> None:
+    """Print a comparison of analyze() results as a table."""
+    columns = ('used_buckets', 'expected_used_buckets', 'distinct_hashes', 'max_chain_length', 'max_probe_length',
+               'uniformity')
+    print(f"{'function':<22}" + ''.join(f"{column:>23}" for column in columns))
+    for name, result in results.items():
+        cells = ''
+        for column in columns:
+            value = result[column]
+            cells += f"{value:>23.2f}" if isinstance(value, float) else f"{str(value):>23}"
+        print(f"{name:<22}" + cells)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare how evenly hash functions spread a key corpus.")
+    parser.add_argument('keys', nargs='?', help="file with one key per line (default: 'str' + counter keys)")
+    parser.add_argument('--capacity', type=int, default=1009)
+    parser.add_argument('--count', type=int, default=500, help="number of generated keys when no file is given")
+    parser.add_argument('--probing', default='quadratic')
+    args = parser.parse_args()
+
+    if args.keys:
+        with open(args.keys) as file:
+            corpus = [line.rstrip('\n') for line in file]
+    else:
+        corpus = ['str' + str(i) for i in range(args.count)]
+    print_report(compare(corpus, args.capacity, probing=args.probing))
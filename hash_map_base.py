@@ -0,0 +1,174 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Base class shared by the separate chaining and open addressing hash maps. Holds what does not depend on
+#              how a table stores its keys: sizing through the capacity policy, the bookkeeping of progressive
+#              resizes, bulk loading, the lazy views and resetting the stats.
+
+from math import ceil
+
+from map_views import ItemsView, KeysView, ValuesView
+from a6_include import batch_hash, to_list, hash_function_1
+
+
+class HashMapBase:
+    """
+    Base class for HashMap in hash_map_sc.py and hash_map_oa.py.
+    A subclass owns the table itself. It sets the attributes of its constructor (_policy, _capacity, _mask, _size,
+    _max_load, _min_load, _stats, _last_resize_time, _debug and the progressive resize state _rehash_step,
+    _old_table, _old_capacity, _old_mask, _rehash_index, _rehash_moved, _rehash_seconds) and provides resize_table,
+    verify, _put, _migrate, _iter_items and the hooks _begin_rehash and _reset_old_counts.
+    """
+
+    # the load factor a map grows at unless its capacity policy sets another one
+    DEFAULT_MAX_LOAD = 1.0
+
+    def put_many(self, items) -> None:
+        """
+        Adds many key/value pairs at once. The final capacity is computed up front so the table resizes at most once,
+        the keys are hashed in a single batch and every pair is placed directly.
+
+        :param items: An iterable (or DynamicArray) of (key, value) tuples. Later duplicates overwrite earlier ones.
+        """
+        items = to_list(items)
+        self._finish_rehash()
+        # presize for a load factor of at most the max load once every pair is in
+        self._presize(ceil((self._size + len(items)) / self._max_load))
+        hashes = batch_hash(self._hash_function, [item[0] for item in items])
+        for (key, value), hash in zip(items, hashes):
+            self._put(key, value, hash)
+        if self._debug:
+            self.verify()
+
+    def _presize(self, required: int) -> None:
+        """
+        Makes room for put_many before its first insert.
+
+        :param required: The capacity the table needs once every pair is in.
+        """
+        if required > self._capacity:
+            self.resize_table(required)
+
+    @classmethod
+    def from_items(cls, items, capacity: int = 11, function: callable = hash_function_1, **options) -> "HashMapBase":
+        """
+        Builds a new hash map from key/value pairs, sized for all of them before the first insert.
+
+        :param items: An iterable (or DynamicArray) of (key, value) tuples.
+        :param capacity: The minimum capacity of the new map.
+        :param function: The hash function for the new map.
+        :param options: Any other keyword arguments for the constructor, such as policy.
+
+        :return: The new hash map.
+        """
+        items = to_list(items)
+        hash_map = cls(max(capacity, ceil(len(items) / cls.DEFAULT_MAX_LOAD)), function, **options)
+        hash_map.put_many(items)
+        return hash_map
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Rounds a requested capacity to one the capacity policy allows, growing it until the entries fit.
+
+        :param new_capacity: The requested capacity.
+
+        :return: The capacity to resize to.
+        """
+        capacity = self._policy.round(new_capacity)
+        # keep doubling while the entries would not fit under the max load factor
+        while self._size and (self._size - 1) / capacity >= self._max_load:
+            capacity = self._policy.round(self._policy.grow(capacity))
+        return capacity
+
+    def _resize_to(self, new_capacity: int) -> None:
+        """
+        Grows or shrinks the table on behalf of put and remove: at once, or progressively if the map has a
+        rehash_step.
+
+        :param new_capacity: The requested capacity.
+        """
+        if self._rehash_step is None:
+            self.resize_table(new_capacity)
+        else:
+            self._start_rehash(new_capacity)
+
+    def _shrink_table(self) -> bool:
+        """
+        Shrinks the table after a remove left the load factor below the policy's min load, unless a progressive
+        resize is still running.
+
+        :return: True if the table was shrunk (or a progressive shrink started).
+        """
+        if self._size < self._min_load * self._capacity and self._old_table is None:
+            capacity = self._policy.shrink(self._capacity, self._size, self._max_load)
+            if capacity < self._capacity:
+                self._resize_to(capacity)
+                return True
+        return False
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Starts a progressive resize. Keeps the current table as the old one and allocates a new one through
+        _begin_rehash; later operations move the old entries across a few at a time.
+
+        :param new_capacity: An integer for the new capacity of the table.
+        """
+        self._finish_rehash()
+        capacity = self._fit_capacity(new_capacity)
+        self._old_capacity, self._old_mask = self._capacity, self._mask
+        self._capacity = capacity
+        self._mask = self._policy.mask(capacity)
+        self._begin_rehash()
+        self._rehash_index = 0
+        self._rehash_moved = 0
+        self._rehash_seconds = 0.0
+
+    def _end_rehash(self) -> None:
+        """
+        Ends a progressive resize once _migrate has moved everything out of the old table, and records it as the
+        most recent resize.
+        """
+        self._old_table = None
+        self._reset_old_counts()
+        self._last_resize_time = self._rehash_seconds
+        if self._stats is not None:
+            self._stats.record_resize(self._rehash_moved, self._rehash_seconds, self._old_capacity, self._capacity)
+
+    def _finish_rehash(self) -> None:
+        """
+        Moves everything left in the old table of a progressive resize, if one is running.
+        """
+        if self._old_table is not None:
+            self._migrate(self._old_capacity)
+
+    def get_last_resize_time(self) -> float:
+        """
+        Returns how long the most recent resize_table call took.
+
+        :return: The time in seconds, or 0.0 if the map has never been resized.
+        """
+        return self._last_resize_time
+
+    def reset_stats(self) -> None:
+        """
+        Sets the counters kept with stats=True back to zero.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def keys(self) -> KeysView:
+        """
+        Returns a lazy view of the keys in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a lazy view of the values in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a lazy view of the (key, value) pairs in the hash map.
+        """
+        return ItemsView(self)
@@ -3,128 +3,334 @@
 # Course: CS261 - Data Structures
 # Assignment: Assignment 6: HashMap (Portfolio Assignment)
 # Due Date: 12/2/2022
-# Description: Python implementation of an open addressing hash map with quadratic probing. Hash functions
-#              are found in a6_include.py. Includes an iterator/next method for the hash map.
+# Description: Python implementation of an open addressing hash map with quadratic probing by default (other probe
+#              sequences are in probing.py). Hash functions are found in a6_include.py. Includes an iterator/next
+#              method for the hash map.
+
+from math import ceil
+from time import perf_counter
+
+from capacity_policy import REHASH_EMPTY_VISITS, CapacityPolicy, snapshot_policy
+from hash_map_base import HashMapBase
+from map_stats import MapStats
+from mapped_hash_map import MappedHashMap, probing_name, write_table
+from oa_storage import EMPTY, LIVE, STORAGE, TOMBSTONE
+from probing import get_strategy
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for HashMap, so several iterations can run at once.
+    Iterates over the table the map had when the iterator was created.
+    """
+
+    def __init__(self, table) -> None:
+        """Initialize the iterator at the first slot of a table."""
+        self._table = table
+        self._index = 0
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
 
+    def __next__(self):
+        """Return the next live entry and advance the iterator."""
+        table = self._table
+        while self._index < table.capacity and table.state(self._index) != LIVE:
+            self._index += 1
+        if self._index >= table.capacity:
+            raise StopIteration
+        value = table.entry(self._index)
+        self._index += 1
 
-class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+        return value
+
+
+class HashMap(HashMapBase):
+    # open addressing needs empty indices to end its probes
+    DEFAULT_MAX_LOAD = 0.5
+
+    def __init__(self, capacity: int, function, policy: CapacityPolicy = None, storage: str = 'entries',
+                 tombstone_threshold: float = 0.25, probing='quadratic', stats: bool = False,
+                 rehash_step: int = None, debug: bool = False) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        quadratic probing for collision resolution.
+        The capacity policy decides how capacities are rounded and grown (primes and doubling by default), the load
+        factor the map grows at (0.5 by default, which quadratic probing on prime capacities cannot exceed) and
+        whether and when removes shrink it.
+        The storage mode is 'entries' (a DynamicArray of HashEntry objects) or 'compact' (parallel arrays).
+        The table is rehashed in place once tombstones fill more than tombstone_threshold of the capacity.
+        probing is 'linear', 'quadratic', 'double', 'robin_hood' or a ProbingStrategy instance.
+        With stats=True the map counts lookups (get, contains_key and pop), their probe lengths and resizes for
+        stats().
+        With rehash_step set, growing the table in put is progressive: the new table is allocated and the old one
+        kept, then every put, get, contains_key and remove moves its key plus up to rehash_step more old entries
+        across, until none are left. resize_table and rehash always move everything at once.
+        With debug=True every change to the map is followed by verify(), which checks the size, tombstone and probe
+        distance counters against a full scan of the table.
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if storage not in STORAGE:
+            raise ValueError(f"unknown storage mode {storage!r}, expected one of {tuple(STORAGE)}")
+        if rehash_step is not None and rehash_step < 1:
+            raise ValueError(f"rehash_step must be at least 1, got {rehash_step!r}")
+        self._storage = storage
+        self._policy = policy if policy is not None else CapacityPolicy()
+        self._probing = get_strategy(probing)
+        self._max_load, self._min_load = self._policy.load_limits(self.DEFAULT_MAX_LOAD)
+        if self._max_load >= 1:
+            raise ValueError(f"max_load must be less than 1 for open addressing, got {self._max_load}")
+        # a quadratic probe only reaches half the indices of a prime table
+        if self._max_load > 0.5 and self._probing.name == 'quadratic' and self._policy.mode != 'pow2':
+            raise ValueError("quadratic probing on prime capacities needs a max_load of at most 0.5")
+
+        # capacity must be a prime number (or a power of two in pow2 mode)
+        self._capacity = self._policy.initial(capacity)
+        self._mask = self._policy.mask(self._capacity)
+        self._table = STORAGE[storage](self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0
+        self._tombstone_threshold = tombstone_threshold
+        self._last_resize_time = 0.0
+        self._stats = MapStats() if stats else None
+
+        # progressive resize state; _old_table is None unless a resize is running
+        self._rehash_step = rehash_step
+        self._old_table = None
+        self._old_capacity = 0
+        self._old_mask = None
+        self._rehash_index = 0
+        self._rehash_total = 0
+        self._rehash_moved = 0
+        self._rehash_seconds = 0.0
+
+        # probe distance counters for the live entries: _distance_counts[n] is the number of entries n steps past
+        # their home index. The lists never end in a zero count past index 0, so their last index is the longest
+        # probe. The old table of a progressive resize keeps its own counts, which only fall as entries move out.
+        self._distance_counts = [0]
+        self._old_distance_counts = [0]
+        self._debug = debug
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Prints one line per slot in the original format whichever storage the table uses; a compact table's slots
+        are shown as HashEntry copies.
         """
         out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._table.entry(i)) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    def get_size(self) -> int:
         """
-        Increment from given number to find the closest prime number
+        Return size of map
         DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return self._size
 
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def get_capacity(self) -> int:
         """
-        Determine if given integer is a prime number and return boolean
+        Return capacity of map
         DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        return self._capacity
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    # ------------------------------------------------------------------ #
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _find_slot(self, key: str, hash: int = None, lookup: bool = False) -> (int, bool, int):
+        """
+        Probes the table once for a key. The key is hashed a single time and the probe stops at the first empty
+        index. Cached entry hashes are compared before keys.
 
-        return True
+        :param key: The key to search for.
+        :param hash: The full hash of the key, if it is already known.
+        :param lookup: True for the reads of get, contains_key and pop, which are counted when stats are on.
 
-    def get_size(self) -> int:
+        :return: A tuple (index, found, distance). If found is True the index holds the live entry for the key,
+        otherwise it is the first tombstone or empty index the key can be inserted at (or None if the table has no
+        usable index). distance is how many steps past the key's home index the index is.
         """
-        Return size of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        if hash is None:
+            hash = self._hash_function(key)
+        if self._stats is None or not lookup:
+            return self._table.find(key, hash, self._probe(hash, key))
+        # count the probes as the table consumes them
+        probe, probes = self._probe(hash, key), 0
+
+        def counted():
+            nonlocal probes
+            for index in probe:
+                probes += 1
+                yield index
+
+        index, found, distance = self._table.find(key, hash, counted())
+        self._stats.record_lookup(found, probes)
+        return index, found, distance
+
+    def _probe(self, hash: int, key: str):
         """
-        return self._size
+        Returns the probe sequence of a key from the map's probing strategy, visiting at most capacity indices.
 
-    def get_capacity(self) -> int:
+        :param hash: The full hash of the key.
+        :param key: The key, used by strategies such as double hashing that need a second hash.
         """
-        Return capacity of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        return self._probing.probe(hash, key, self._capacity, self._mask)
+
+    def _robin_hood_insert(self, key: str, value: object, hash: int) -> None:
         """
-        return self._capacity
+        Inserts a key that is not in the table with Robin Hood linear probing. Walking from the home index, the entry
+        being carried swaps places with any resident that is closer to its own home index.
 
-    # ------------------------------------------------------------------ #
+        :param key: The key for the value.
+        :param value: The value for the key.
+        :param hash: The full hash of the key.
+        """
+        table, probing, counts = self._table, self._probing, self._distance_counts
+        capacity, mask = self._capacity, self._mask
+        index = hash % capacity if mask is None else hash & mask
+        distance = 0
+        while table.state(index) != EMPTY:
+            resident_hash, resident_key = table.hash_at(index), table.key_at(index)
+            resident_distance = probing.distance(resident_hash, resident_key, index, capacity, mask)
+            if resident_distance < distance:
+                resident_value = table.value_at(index)
+                table.store(index, key, value, hash)
+                self._count_distance(counts, distance, 1)
+                self._count_distance(counts, resident_distance, -1)
+                key, value, hash, distance = resident_key, resident_value, resident_hash, resident_distance
+            index = (index + 1) % capacity
+            distance += 1
+        table.store(index, key, value, hash)
+        self._count_distance(counts, distance, 1)
+
+    def _backward_shift(self, index: int) -> None:
+        """
+        Removes the entry at an index of a Robin Hood table and shifts the following displaced entries back one
+        index, so no tombstone is needed.
+
+        :param index: The index of the entry to remove.
+        """
+        table, probing, counts = self._table, self._probing, self._distance_counts
+        capacity, mask = self._capacity, self._mask
+        table.erase(index)
+        following = (index + 1) % capacity
+        while table.state(following) == LIVE:
+            distance = probing.distance(table.hash_at(following), table.key_at(following), following, capacity, mask)
+            if distance == 0:
+                break
+            table.adopt(table, following, index)
+            table.erase(following)
+            # the entry moved one step closer to its home index
+            self._count_distance(counts, distance, -1)
+            self._count_distance(counts, distance - 1, 1)
+            index, following = following, (following + 1) % capacity
 
     def put(self, key: str, value: object) -> None:
         """
         Adds a key/value pair into the hash map. If a key already exists in the hash map, just the value is updated.
-        Resizes the hash map if the load factor is >= 0.5.
+        Resizes the hash map by the policy's growth factor if the load factor is >= the policy's max load (0.5 by
+        default), progressively if the map has a rehash_step.
 
         :param key: A string that is hashed and is the key for a value.
         :param value: Any object that will represent the value in the key/value pair.
         """
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
-        # add key/value if index is empty
-        index = self._hash_function(key) % self._capacity
-        if self._buckets[index] is None or self._buckets[index].is_tombstone:
-            self._buckets[index] = HashEntry(key, value)
-            self._size += 1
+        hash = self._hash_function(key)
+        self._make_room(key, hash)
+        self._put(key, value, hash)
+        if self._debug:
+            self.verify()
+
+    def _make_room(self, key: str, hash: int) -> None:
+        """
+        Grows the table before a possible insert once the load factor is >= the max load (or rehashes away the
+        tombstones), and moves the key plus the next few entries if a progressive resize is running.
+
+        :param key: The key about to be inserted.
+        :param hash: The full hash of the key.
+        """
+        if self.table_load() >= self._max_load:
+            self._resize_to(self._policy.grow(self._capacity))
+        # live entries plus tombstones must stay under the max load for the probe to always find an empty index
+        elif self._tombstones and (self.effective_load() >= self._max_load or self._too_many_tombstones()):
+            self.rehash()
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, key, hash)
+
+    def _needs_room(self) -> bool:
+        """
+        Checks whether _make_room would have to grow the table, rehash it or move entries before an insert.
+
+        :return: True if an insert has to go through _make_room first.
+        """
+        return (self._old_table is not None or self.table_load() >= self._max_load
+                or bool(self._tombstones) and (self.effective_load() >= self._max_load or self._too_many_tombstones()))
+
+    def _put(self, key: str, value: object, hash: int) -> None:
+        """
+        Adds or updates a key/value pair whose full hash is already known. Does not check the load factor.
+
+        :param key: The key for the value.
+        :param value: The value for the key.
+        :param hash: The full hash of the key.
+        """
+        index, found, distance = self._find_slot(key, hash)
         # if just updating a key/value
-        elif self.contains_key(key):
-            if self._buckets[index].key == key:
-                self._buckets[index].value = value
-            # subsequent probes
-            else:
-                j = 1
-                # since key is known to exist in table, probe until it's found
-                while True:
-                    index = (self._hash_function(key) + j ** 2) % self._capacity
-                    if self._buckets[index].key == key:
-                        self._buckets[index].value = value
-                        return
-                    j += 1
-        # when the index is already occupied
+        if found:
+            self._table.set_value(index, value)
         else:
-            j = 1
-            while self._buckets[index] is not None:
-                index = (self._hash_function(key) + j ** 2) % self._capacity
-                if self._buckets[index] is None or self._buckets[index].is_tombstone:
-                    self._buckets[index] = HashEntry(key, value)
-                    self._size += 1
-                    return
-                j += 1
+            self._insert_at(index, distance, key, value, hash)
+
+    def _insert_at(self, index: int, distance: int, key: str, value: object, hash: int) -> None:
+        """
+        Inserts a key that _find_slot did not find, at the index it returned.
+
+        :param index: The first tombstone or empty index on the key's probe path.
+        :param distance: How many steps past the key's home index the index is.
+        :param key: The key for the value.
+        :param value: The value for the key.
+        :param hash: The full hash of the key.
+        """
+        if self._probing.robin_hood:
+            self._robin_hood_insert(key, value, hash)
+        # otherwise reuse the first tombstone or empty index on the probe path
+        else:
+            if self._tombstones and self._table.state(index) == TOMBSTONE:
+                self._tombstones -= 1
+            self._table.store(index, key, value, hash)
+            self._count_distance(self._distance_counts, distance, 1)
+        self._size += 1
+
+    @staticmethod
+    def _count_distance(counts: list, distance: int, change: int) -> None:
+        """
+        Updates a list of probe distance counters for an entry placed at (change 1) or taken from (change -1) a
+        distance, trimming the zero counts off its end.
+
+        :param counts: The counters of the current or the old table.
+        :param distance: The entry's probe distance.
+        :param change: 1 or -1.
+        """
+        while distance >= len(counts):
+            counts.append(0)
+        counts[distance] += change
+        while len(counts) > 1 and counts[-1] == 0:
+            counts.pop()
+
+    def _presize(self, required: int) -> None:
+        """
+        Makes room for put_many before its first insert, rehashing away tombstones that would leave too few empty
+        indices once every pair is in.
+
+        :param required: The capacity the table needs once every pair is in.
+        """
+        if required > self._capacity:
+            self.resize_table(required)
+        elif self._tombstones and required + ceil(self._tombstones / self._max_load) > self._capacity:
+            self.rehash()
 
     def table_load(self) -> float:
         """
@@ -134,66 +340,265 @@ class HashMap:
         """
         return self._size / self._capacity
 
+    def effective_load(self) -> float:
+        """
+        Returns the load factor counting tombstones as occupied, which is what probe lengths depend on.
+
+        :return: A float representing the effective load factor.
+        """
+        return (self._size + self._tombstones) / self._capacity
+
+    def get_tombstones(self) -> int:
+        """
+        Returns the number of tombstones currently in the table.
+
+        :return: The tombstone count.
+        """
+        return self._tombstones
+
+    def _too_many_tombstones(self) -> bool:
+        """
+        Checks if the tombstones have crossed the configured share of the capacity.
+
+        :return: True if the table should be rehashed.
+        """
+        return self._tombstones > self._tombstone_threshold * self._capacity
+
+    def rehash(self) -> None:
+        """
+        Rebuilds the table at its current capacity, dropping every tombstone.
+        """
+        self.resize_table(self._capacity)
+
+    def probe_distances(self) -> (float, int):
+        """
+        Reports how far the live entries sit from their home index along the probe sequence, from the probe distance
+        counters. During a progressive resize the entries of both tables are included.
+
+        :return: A tuple (average distance, maximum distance). Both are 0 for an empty map.
+        """
+        if self._size == 0:
+            return 0.0, 0
+        total = sum(distance * count for distance, count in self._distances().items())
+        return total / self._size, self.longest_probe()
+
+    def longest_probe(self) -> int:
+        """
+        Returns the longest probe distance of any live entry, from the probe distance counters. During a progressive
+        resize this is the longest in either table.
+
+        :return: The number of steps past its home index the furthest entry sits.
+        """
+        return max(len(self._distance_counts), len(self._old_distance_counts)) - 1
+
+    def _distances(self) -> dict:
+        """
+        Merges the probe distance counters of the current table and the old table of a progressive resize.
+
+        :return: A dict mapping each probe distance to its number of live entries, sorted by distance.
+        """
+        distances = {}
+        for counts in (self._distance_counts, self._old_distance_counts):
+            for distance, count in enumerate(counts):
+                if count:
+                    distances[distance] = distances.get(distance, 0) + count
+        return dict(sorted(distances.items()))
+
+    def _scan(self, table, capacity: int, mask) -> list:
+        """
+        Counts the probe distances of a table's live entries the slow way, by visiting every slot.
+
+        :param table: The current or the old table.
+        :param capacity: Its capacity.
+        :param mask: Its index mask, or None.
+
+        :return: The probe distance counts, in the form of the counters.
+        """
+        counts = [0]
+        for index in range(capacity):
+            if table.state(index) == LIVE:
+                distance = self._probing.distance(table.hash_at(index), table.key_at(index), index, capacity, mask)
+                self._count_distance(counts, distance, 1)
+        return counts
+
     def empty_buckets(self) -> int:
         """
-        Counts the number of empty buckets. Tombstone values are considered empty.
+        Counts the number of empty buckets from the size counter. Tombstone values are considered empty. During a
+        progressive resize this is the number the current table will have once every entry has moved in.
         """
-        total = 0
-        for value in self:
-            total += 1
-        return self._capacity - total
+        return self._capacity - self._size
+
+    def verify(self) -> None:
+        """
+        Checks the size, tombstone and probe distance counters against a full scan of the table (and the old table of
+        a progressive resize, whose tombstones are not counted). Called after every change in debug mode.
+        Raises AssertionError describing the first counter that does not match.
+        """
+        table = self._table
+        states = [table.state(index) for index in range(table.capacity)]
+        live, tombstones = states.count(LIVE), states.count(TOMBSTONE)
+        if self._old_table is not None:
+            live += sum(self._old_table.state(index) == LIVE for index in range(self._old_capacity))
+        if live != self._size:
+            raise AssertionError(f"size is {self._size} but the table holds {live} live entries")
+        if tombstones != self._tombstones:
+            raise AssertionError(f"tombstone count is {self._tombstones} but the table holds {tombstones}")
+        counts = self._scan(table, self._capacity, self._mask)
+        if counts != self._distance_counts:
+            raise AssertionError(f"probe distance counts are {self._distance_counts} but the table has {counts}")
+        if self._old_table is not None:
+            counts = self._scan(self._old_table, self._old_capacity, self._old_mask)
+            if counts != self._old_distance_counts:
+                raise AssertionError(f"old probe distance counts are {self._old_distance_counts} but the old table "
+                                     f"has {counts}")
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes the hash map capacity to the passed value. Rehashes existing values and removes tombstones.
+        Resizes the hash map capacity to the passed value. Moves the existing entries straight into the new table by
+        their cached hashes and removes tombstones, finishing any progressive resize first. The time taken is
+        available from get_last_resize_time().
 
         :param new_capacity: An integer for the new capacity of the table.
         """
         if new_capacity < self._size:
             return
-        # save original map and capacity
-        original_map = DynamicArray()
-        for index in range(self._buckets.length()):
-            original_map.append(self._buckets[index])
-        # reset the current map (for rehashing)
-        self._buckets = DynamicArray()
-        self._size = 0
-        # update new_capacity to a prime if needed
-        if self._is_prime(new_capacity):
-            self._capacity = new_capacity
+        self._finish_rehash()
+        start = perf_counter()
+        old_capacity = self._capacity
+        capacity = self._fit_capacity(new_capacity)
+        original_map = self._table
+        self._table = table = STORAGE[self._storage](capacity)
+        self._capacity = capacity
+        self._mask = self._policy.mask(capacity)
+        self._distance_counts = counts = [0]
+        # move the live entries to the first empty index of their probe sequence, dropping tombstones
+        for index in range(original_map.capacity):
+            if original_map.state(index) != LIVE:
+                continue
+            hash, key = original_map.hash_at(index), original_map.key_at(index)
+            if self._probing.robin_hood:
+                self._robin_hood_insert(key, original_map.value_at(index), hash)
+            else:
+                new_index, distance = table.first_empty(self._probe(hash, key))
+                table.adopt(original_map, index, new_index)
+                self._count_distance(counts, distance, 1)
+        self._tombstones = 0
+        self._last_resize_time = perf_counter() - start
+        if self._stats is not None:
+            self._stats.record_resize(self._size, self._last_resize_time, old_capacity, capacity)
+        if self._debug:
+            self.verify()
+
+    def _begin_rehash(self) -> None:
+        """
+        Keeps the table and its probe distance counters as the old table of a progressive resize and allocates an
+        empty table for the new capacity. Tombstones are left behind with the old table.
+        """
+        self._old_table, self._table = self._table, STORAGE[self._storage](self._capacity)
+        self._tombstones = 0
+        # the counters follow the entries into the old table
+        self._old_distance_counts, self._distance_counts = self._distance_counts, [0]
+        self._rehash_total = self._size
+
+    def _reset_old_counts(self) -> None:
+        """
+        Resets the probe distance counters of the old table for when no progressive resize is running.
+        """
+        self._old_distance_counts = [0]
+
+    def _migrate(self, count: int, key: str = None, hash: int = None) -> None:
+        """
+        Advances a progressive resize. Moves a key out of the old table, so the caller only has to look at the
+        current one, then up to count more live old entries in index order, visiting at most REHASH_EMPTY_VISITS
+        other slots per entry. Ends the resize once every old entry has been moved.
+
+        :param count: The number of old entries to move.
+        :param key: The key the caller is about to look up, insert or remove, if any.
+        :param hash: The full hash of that key.
+        """
+        start = perf_counter()
+        old = self._old_table
+        if key is not None:
+            index, found, distance = old.find(key, hash,
+                                              self._probing.probe(hash, key, self._old_capacity, self._old_mask))
+            if found:
+                self._move_old_entry(index, distance)
+        index, end, visits = self._rehash_index, self._old_capacity, count * REHASH_EMPTY_VISITS
+        while count and visits and index < end:
+            if old.state(index) == LIVE:
+                self._move_old_entry(index)
+                count -= 1
+            else:
+                visits -= 1
+            index += 1
+        self._rehash_index = index
+        self._rehash_seconds += perf_counter() - start
+        if index == end:
+            self._end_rehash()
+
+    def _move_old_entry(self, index: int, distance: int = None) -> None:
+        """
+        Moves one live entry of a progressive resize's old table into the current table. The old slot becomes a
+        tombstone, so the probe sequences of the entries still in the old table stay intact.
+
+        :param index: The index of the entry in the old table.
+        :param distance: The entry's probe distance in the old table, if it is already known.
+        """
+        old, table = self._old_table, self._table
+        hash, key = old.hash_at(index), old.key_at(index)
+        if distance is None:
+            distance = self._probing.distance(hash, key, index, self._old_capacity, self._old_mask)
+        self._count_distance(self._old_distance_counts, distance, -1)
+        if self._probing.robin_hood:
+            self._robin_hood_insert(key, old.value_at(index), hash)
         else:
-            self._capacity = self._next_prime(new_capacity)
-        # fill in the new hashmap with None (also resizes the DynamicArray)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
-        # repopulate new map, removing tombstones
-        for index in range(original_map.length()):
-            if original_map[index] and not original_map[index].is_tombstone:
-                self.put(original_map[index].key, original_map[index].value)
+            new_index, distance = table.first_empty(self._probe(hash, key))
+            table.adopt(old, index, new_index)
+            self._count_distance(self._distance_counts, distance, 1)
+        old.vacate(index)
+        self._rehash_moved += 1
 
-    def get(self, key: str) -> object:
+    def stats(self) -> dict:
+        """
+        Reports the health of the table, including a histogram of the probe distances of the live entries. Lookup,
+        probe length and resize counters are included when the map was created with stats=True.
+
+        :return: A dict of plain values, ready to export as metrics.
+        """
+        result = {
+            'size': self._size,
+            'capacity': self._capacity,
+            'table_load': self.table_load(),
+            'effective_load': self.effective_load(),
+            'tombstones': self._tombstones,
+            'tombstone_density': self._tombstones / self._capacity,
+            'probing': self._probing.name,
+            'storage': self._storage,
+            'probe_distances': self._distances(),
+            'longest_probe': self.longest_probe(),
+            # entries still waiting in the old table of a progressive resize
+            'rehash_pending': self._rehash_total - self._rehash_moved if self._old_table is not None else 0,
+        }
+        if self._stats is not None:
+            result.update(self._stats.as_dict())
+        return result
+
+    def get(self, key: str, default: object = None) -> object:
         """
         Get the value associated with a key.
 
         :param key: The string key to retrieve the associated value.
+        :param default: The value to return if the key isn't found.
 
         :return: The value.
         """
-        index = self._hash_function(key) % self._capacity
-        # check if the key exists in the list, if it doesn't result is None
-        if self.contains_key(key):
-            # on first probe
-            if self._buckets[index].key == key:
-                return self._buckets[index].value
-            # subsequent probes
-            else:
-                j = 1
-                # since key is known to exist in table, probe until it's found
-                while True:
-                    index = (self._hash_function(key) + j ** 2) % self._capacity
-                    if self._buckets[index].key == key:
-                        return self._buckets[index].value
-                    j += 1
+        hash = self._hash_function(key)
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, key, hash)
+        index, found, _ = self._find_slot(key, hash, lookup=True)
+        if found:
+            return self._table.value_at(index)
+        return default
 
     def contains_key(self, key: str) -> bool:
         """
@@ -203,57 +608,142 @@ class HashMap:
 
         :return: True if found, false if not.
         """
-        index = self._hash_function(key) % self._capacity
-        # empty table or the first spot check results in None
-        if self._size == 0 or not self._buckets[index]:
+        # empty table
+        if self._size == 0:
             return False
-        # First possible index matches
-        elif self._buckets[index].key == key:
-            if self._buckets[index].is_tombstone is True:
-                return False
-            return True
-        # Index is not none, check next w/ quadratic probing
-        else:
-            j = 1
-            # probe until either key is found or None
-            while self._buckets[index] is not None:
-                index = (self._hash_function(key) + j**2) % self._capacity
-                if self._buckets[index] and self._buckets[index].key == key:
-                    if self._buckets[index].is_tombstone is True:
-                        return False
-                    return True
-                j += 1
-        return False
+        hash = self._hash_function(key)
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, key, hash)
+        return self._find_slot(key, hash, lookup=True)[1]
 
     def remove(self, key: str) -> None:
         """
         Remove a key/value pair from the hash map. Does not set the index to None, instead flips is_tombstone to True.
+        Rehashes the table once tombstones cross the configured threshold. Robin Hood maps shift the following
+        entries back instead of leaving a tombstone.
+
+        :param key: The key of the key/value pair to remove.
+        """
+        self.pop(key)
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Removes a key/value pair from the hash map like remove and returns its value.
 
         :param key: The key of the key/value pair to remove.
+        :param default: The value to return if the key isn't found.
+
+        :return: The removed value, or default.
+        """
+        hash = self._hash_function(key)
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, key, hash)
+        index, found, distance = self._find_slot(key, hash, lookup=True)
+        if not found:
+            return default
+        value = self._table.value_at(index)
+        self._remove_at(index, distance)
+        if self._debug:
+            self.verify()
+        return value
+
+    def _remove_at(self, index: int, distance: int) -> None:
+        """
+        Removes the live entry at an index, leaving a tombstone or, for Robin Hood maps, shifting the following
+        entries back. Then shrinks the table if the policy asks for it, or rehashes it once there are too many
+        tombstones.
+
+        :param index: The index of the entry to remove.
+        :param distance: How many steps past its home index the entry sits.
+        """
+        self._size -= 1
+        self._count_distance(self._distance_counts, distance, -1)
+        if self._probing.robin_hood:
+            self._backward_shift(index)
+            self._shrink_table()
+        else:
+            self._table.bury(index)
+            self._tombstones += 1
+            if not self._shrink_table() and self._too_many_tombstones():
+                self.rehash()
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value of a key, starting from 0 if the key isn't in the hash map. Hashes and probes for the
+        key once.
+
+        :param key: The key to count.
+        :param delta: The amount to add.
+
+        :return: The new value.
+        """
+        return self._upsert(key, lambda value: delta if value is None else value + delta)[0]
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value of a key, first adding the key with the default value if it isn't in the hash map.
+
+        :param key: The key to look up.
+        :param default: The value to add if the key isn't found. A default of None adds nothing.
+
+        :return: The value of the key after the call.
+        """
+        return self._upsert(key, lambda value: default if value is None else value)[0]
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Replaces the value of a key with function(key, current value), where the current value is None if the key
+        isn't in the hash map. A result of None removes the key.
+
+        :param key: The key to update.
+        :param function: Called as function(key, value) to produce the new value.
+
+        :return: The new value, or None if the key was removed or stayed absent.
+        """
+        return self._upsert(key, lambda value: function(key, value))[0]
+
+    def _upsert(self, key: str, function: callable) -> (object, bool):
         """
-        index = self._hash_function(key) % self._capacity
-        if self.contains_key(key):
-            if self._buckets[index].key == key:
-                self._buckets[index].is_tombstone = True
+        Replaces the value of a key with function(value) in place, with a single hash and probe. The function is
+        called with None for a missing key; a result of None removes the key or leaves it absent.
+
+        :param key: The key to update.
+        :param function: Called with the current value (or None) to produce the new value.
+
+        :return: A tuple (the new value, True if the key was already in the hash map).
+        """
+        hash = self._hash_function(key)
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, key, hash)
+        index, found, distance = self._find_slot(key, hash)
+        if found:
+            value = function(self._table.value_at(index))
+            if value is None:
+                self._remove_at(index, distance)
             else:
-                j = 1
-                # since key is known to exist in table, probe until it's found
-                while True:
-                    index = (self._hash_function(key) + j ** 2) % self._capacity
-                    if self._buckets[index].key == key:
-                        self._buckets[index].is_tombstone = True
-                        self._size -= 1
-                        return
-                    j += 1
-            self._size -= 1
+                self._table.set_value(index, value)
+        else:
+            value = function(None)
+            if value is not None:
+                # only an insert needs room; growing or rehashing moves entries, so probe again afterwards
+                if self._needs_room():
+                    self._make_room(key, hash)
+                    index, _, distance = self._find_slot(key, hash)
+                self._insert_at(index, distance, key, value, hash)
+        if self._debug:
+            self.verify()
+        return value, found
 
     def clear(self) -> None:
         """
         Clears the hash map of all values but does not alter the capacity. Replaces them all with None and resets size.
         """
-        for index in range(self._buckets.length()):
-            self._buckets[index] = None
+        self._table.clear()
+        self._old_table = None
         self._size = 0
+        self._tombstones = 0
+        self._distance_counts = [0]
+        self._old_distance_counts = [0]
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -262,31 +752,95 @@ class HashMap:
         :return: A dynamic array where each index contains a tuple for each key/value pair (key, value).
         """
         results = DynamicArray()
-        for bucket in self:
-            results.append((bucket.key, bucket.value))
+        for pair in self._iter_items():
+            results.append(pair)
         return results
 
-    def __iter__(self):
+    def _iter_items(self):
         """
-        Creates an iterator for the HashMap class.
+        Generates the (key, value) pairs of the live entries straight from the table, without building entries.
+        Finishes a progressive resize first.
         """
-        self._index = 0
-        return self
+        self._finish_rehash()
+        table = self._table
+        for index in range(table.capacity):
+            if table.state(index) == LIVE:
+                yield table.key_at(index), table.value_at(index)
 
-    def __next__(self):
+    def _iter_slots(self):
         """
-        Returns the next value in the HashMap.
+        Generates a (state, key, value, hash) tuple for every slot in index order. Finishes a progressive resize first.
         """
-        try:
-            value = self._buckets[self._index]
-            while value is None or value.is_tombstone is True:
-                self._index += 1
-                value = self._buckets[self._index]
-        except DynamicArrayException:
-            raise StopIteration
-        self._index += 1
+        self._finish_rehash()
+        table = self._table
+        for index in range(table.capacity):
+            state = table.state(index)
+            if state == LIVE:
+                yield state, table.key_at(index), table.value_at(index), table.hash_at(index)
+            else:
+                yield state, None, None, None
 
-        return value
+    def save(self, path: str) -> None:
+        """
+        Writes the table slot for slot, with the cached hashes and tombstones, to a binary file that load rebuilds
+        without hashing or probing, and that mapped_hash_map.MappedHashMap can open read-only, so other processes can
+        probe it straight from the page cache instead of rebuilding the map. The slots are streamed to the file.
+        The hash function must be registered in HASH_FUNCTIONS, the probing strategy must be a built-in one and the
+        values must be None, bools, ints, floats, strings or bytes.
+
+        :param path: The file to write.
+        """
+        write_table(path, self._iter_slots(), self._capacity, self._hash_function, self._probing,
+                    self._mask is not None)
+
+    @classmethod
+    def load(cls, path: str, **options) -> "HashMap":
+        """
+        Rebuilds a hash map saved with save. Every entry and tombstone goes straight back into its saved slot with
+        its cached hash; no key is hashed or probed and the table is never resized.
+
+        :param path: The file to read.
+        :param options: Any other keyword arguments for the constructor, such as storage. The probing strategy
+        defaults to the saved one and must be that exact built-in strategy if given (so double hashing must keep its
+        default step function), and a policy must take indices the same way (pow2 or not) as the saved map.
+
+        :return: The loaded hash map.
+        """
+        with MappedHashMap(path) as mapped:
+            options['policy'] = snapshot_policy(options.get('policy'), mapped.is_pow2())
+            saved = mapped.get_probing()
+            requested = get_strategy(options.setdefault('probing', saved.name))
+            # the table only works with the exact probe sequence it was saved with, so the same rule as save applies:
+            # a built-in strategy with its default step function
+            try:
+                matches = probing_name(requested) == saved.name
+            except ValueError:
+                matches = False
+            if not matches:
+                raise ValueError(f"{path} was saved with the built-in {saved} probing, which the requested {requested} "
+                                 f"strategy does not match")
+            hash_map = cls(1, mapped.get_hash_function(), **options)
+            # keep the saved capacity even if the policy would round it differently
+            capacity = mapped.get_capacity()
+            hash_map._capacity = capacity
+            hash_map._mask = hash_map._policy.mask(capacity)
+            hash_map._table = table = STORAGE[hash_map._storage](capacity)
+            for index, (state, key, value, hash) in enumerate(mapped._iter_slots()):
+                if state == LIVE:
+                    table.store(index, key, value, hash)
+                elif state == TOMBSTONE:
+                    table.vacate(index)
+            hash_map._size = mapped.get_size()
+            hash_map._tombstones = mapped.get_tombstones()
+            hash_map._distance_counts = hash_map._scan(table, capacity, hash_map._mask)
+        return hash_map
+
+    def __iter__(self) -> "HashMapIterator":
+        """
+        Creates an independent iterator over the live entries of the HashMap. Finishes a progressive resize first.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._table)
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
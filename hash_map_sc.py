@@ -4,30 +4,127 @@
 # Assignment: Assignment 6: HashMap (Portfolio Assignment)
 # Due Date: 12/2/2022
 # Description: Python implementation of a separate chaining hash map. Hash functions are found in a6_include.py.
-#              Includes a non-class function, find_mode, which finds the mode in a DynamicArray using a hash map.
+#              Includes a non-class function, find_mode, which finds the mode in a DynamicArray using a hash map, and
+#              find_mode_parallel, which shards the counting across a pool of worker processes.
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
 
+from capacity_policy import REHASH_EMPTY_VISITS, CapacityPolicy, snapshot_policy
+from hash_map_base import HashMapBase
+from map_stats import MapStats
+from sc_buckets import CHAINS, EMPTY_BUCKET, TreeBucket
+from sc_snapshot import ChainSnapshot, write_chains
+from a6_include import DynamicArray, LinkedList, to_list, hash_function_1, hash_function_2
 
-class HashMap:
+
+# self-organizing chain policies for successful lookups
+REORDER_POLICIES = (None, 'move_to_front', 'transpose')
+
+# inputs shorter than this are counted by find_mode_parallel in the calling process
+PARALLEL_THRESHOLD = 200000
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for HashMap, so several iterations can run at once.
+    Iterates over the buckets the map had when the iterator was created and yields their SLNodes
+    (copies, for array chains).
+    """
+
+    def __init__(self, buckets: DynamicArray) -> None:
+        """Initialize the iterator before the first bucket."""
+        self._buckets = buckets
+        self._index = 0
+        self._nodes = iter(())
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self):
+        """Return the next node and advance the iterator."""
+        for node in self._nodes:
+            return node
+        while self._index < self._buckets.length():
+            llist = self._buckets[self._index]
+            self._index += 1
+            if llist.length() > 0:
+                self._nodes = iter(llist)
+                return next(self._nodes)
+        raise StopIteration
+
+
+class HashMap(HashMapBase):
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 policy: CapacityPolicy = None,
+                 stats: bool = False,
+                 treeify_threshold: int = None,
+                 reorder: str = None,
+                 chain: str = 'linked',
+                 rehash_step: int = None,
+                 debug: bool = False) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        The capacity policy decides how capacities are rounded and grown (primes and doubling by default), the load
+        factor the map grows at (1.0 by default) and whether and when removes shrink it.
+        With stats=True the map counts lookups (get, contains_key and pop) and resizes for stats().
+        With treeify_threshold set, a bucket turns into a balanced tree once its chain is longer than it, and back
+        into a chain when it shrinks to three quarters of that. None (the default) never builds trees, which is
+        fastest unless the hash function puts many keys in the same buckets.
+        reorder makes chains self-organizing: 'move_to_front' moves a key found by get or contains_key to the head
+        of its chain, 'transpose' moves it one node closer to the head.
+        The chain type is 'linked' (LinkedLists of SLNodes) or 'array' (compact ArrayBuckets of inline entries).
+        Buckets are only allocated on their first insert.
+        With rehash_step set, growing the table in put is progressive: the new buckets are allocated and the old ones
+        kept, then every put, get, contains_key and remove moves the old bucket of its key plus up to rehash_step
+        more old buckets across, until none are left. resize_table always moves everything at once.
+        With debug=True every change to the map is followed by verify(), which checks the occupancy counters against
+        a full scan of the buckets.
         """
-        self._buckets = DynamicArray()
+        if reorder not in REORDER_POLICIES:
+            raise ValueError(f"unknown reorder policy {reorder!r}, expected one of {REORDER_POLICIES}")
+        if chain not in CHAINS:
+            raise ValueError(f"unknown chain type {chain!r}, expected one of {tuple(CHAINS)}")
+        if rehash_step is not None and rehash_step < 1:
+            raise ValueError(f"rehash_step must be at least 1, got {rehash_step!r}")
+        self._chain = CHAINS[chain]
+        self._policy = policy if policy is not None else CapacityPolicy()
+        self._max_load, self._min_load = self._policy.load_limits(self.DEFAULT_MAX_LOAD)
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # capacity must be a prime number (or a power of two in pow2 mode)
+        self._capacity = self._policy.initial(capacity)
+        self._mask = self._policy.mask(self._capacity)
+        self._buckets = DynamicArray([EMPTY_BUCKET] * self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._last_resize_time = 0.0
+        self._stats = MapStats(comparisons=True) if stats else None
+        self._treeify_threshold = treeify_threshold
+        self._reorder = reorder
+        self._untreeify_threshold = treeify_threshold * 3 // 4 if treeify_threshold is not None else None
+
+        # progressive resize state; _old_table is None unless a resize is running
+        self._rehash_step = rehash_step
+        self._old_table = None
+        self._old_capacity = 0
+        self._old_mask = None
+        self._rehash_index = 0
+        self._rehash_moved = 0
+        self._rehash_seconds = 0.0
+
+        # occupancy counters for the current buckets: _chain_counts[n] is the number of buckets holding n keys
+        self._chain_counts = [self._capacity]
+        self._longest = 0
+        self._tree_buckets = 0
+        # the same counters for the old buckets of a progressive resize, which only lose buckets as they move
+        self._reset_old_counts()
+        self._debug = debug
 
     def __str__(self) -> str:
         """
@@ -39,39 +136,6 @@ class HashMap:
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
-        """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
-        """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
-
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
-        """
-        Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
-        """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
-
     def get_size(self) -> int:
         """
         Return size of map
@@ -91,37 +155,220 @@ class HashMap:
     def put(self, key: str, value: object) -> None:
         """
         Adds a key/value pair into the hash map. If a key already exists in the hash map, the value is updated.
-        Resizes the hash map if the load factor is >= 1.
+        Resizes the hash map by the policy's growth factor if the load factor is >= the policy's max load (1 by
+        default), progressively if the map has a rehash_step.
 
         :param key: A string that is hashed and is the key for a value.
         :param value: Any object that will represent the value in the key/value pair.
         """
-        # doubles the capacity and add the empty linked lists
-        if self.table_load() >= 1.0:
-            self.resize_table(self._capacity*2)
-        # inserts a key if it's not already in the hash map
-        index = self._hash_function(key) % self._capacity
-        if not self._buckets[index].contains(key):
-            self._buckets[index].insert(key, value)
-            self._size += 1
-        # override duplicate keys
-        else:
-            llist = self._buckets[index]
-            for node in llist:
-                if node.key == key:
-                    node.value = value
+        hash = self._hash_function(key)
+        self._make_room(hash)
+        self._put(key, value, hash)
+        if self._debug:
+            self.verify()
+
+    def _make_room(self, hash: int) -> None:
+        """
+        Grows the table before a possible insert once the load factor is >= the max load, and moves the next few
+        buckets (starting with the bucket of the hash) if a progressive resize is running.
+
+        :param hash: The full hash of the key about to be inserted.
+        """
+        # doubles the capacity
+        if self.table_load() >= self._max_load:
+            self._resize_to(self._policy.grow(self._capacity))
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, hash)
+
+    def _index(self, hash: int) -> int:
+        """
+        Returns the bucket index for a full hash, using the bit mask instead of the modulo in pow2 mode.
+
+        :param hash: The full hash of a key.
+
+        :return: The bucket index.
+        """
+        if self._mask is None:
+            return hash % self._capacity
+        return hash & self._mask
+
+    def _put(self, key: str, value: object, hash: int) -> None:
+        """
+        Adds or updates a key/value pair whose full hash is already known. Does not check the load factor.
+
+        :param key: The key for the value.
+        :param value: The value for the key.
+        :param hash: The full hash of the key.
+        """
+        index = self._index(hash)
+        llist = self._buckets[index]
+        # allocate the bucket on its first insert
+        if llist is EMPTY_BUCKET:
+            llist = self._buckets[index] = self._chain()
+        # inserts a key if it's not already in the hash map, otherwise overrides its value
+        if llist.put(key, value, hash):
+            self._inserted(index)
+
+    def _count_chain(self, old_length: int, new_length: int) -> None:
+        """
+        Updates the occupancy counters for a bucket whose chain changed length.
+
+        :param old_length: The bucket's length before the change.
+        :param new_length: The bucket's length after it.
+        """
+        counts = self._chain_counts
+        counts[old_length] -= 1
+        while new_length >= len(counts):
+            counts.append(0)
+        counts[new_length] += 1
+        if new_length > self._longest:
+            self._longest = new_length
+        while self._longest and counts[self._longest] == 0:
+            self._longest -= 1
+
+    def _inserted(self, index: int) -> None:
+        """
+        Accounts for a key just inserted into a bucket, and swaps a chain that got too long for a tree.
+
+        :param index: The index of the bucket.
+        """
+        llist = self._buckets[index]
+        length = llist.length()
+        self._size += 1
+        self._count_chain(length - 1, length)
+        # swap a chain that got too long for a tree
+        if self._treeify_threshold is not None and length > self._treeify_threshold and \
+                not isinstance(llist, TreeBucket):
+            self._buckets[index] = TreeBucket.from_nodes(llist)
+            self._tree_buckets += 1
+
+    def _removed(self, index: int) -> None:
+        """
+        Accounts for a key just removed from a bucket, tidies the bucket and shrinks the table if the policy asks
+        for it.
+
+        :param index: The index of the bucket.
+        """
+        length = self._buckets[index].length()
+        self._size -= 1
+        self._count_chain(length + 1, length)
+        self._shrink_bucket(index)
+        self._shrink_table()
+
+    def save(self, path: str) -> None:
+        """
+        Writes the hash map to a binary snapshot file, bucket by bucket in chain order along with the cached hashes,
+        so load can rebuild it without hashing or resizing. Finishes a progressive resize first. The hash function
+        must be registered in HASH_FUNCTIONS and the values must be None, bools, ints, floats, strings or bytes.
+
+        :param path: The file to write.
+        """
+        self._finish_rehash()
+        chain = next(name for name, chain in CHAINS.items() if chain is self._chain)
+        buckets = (self._buckets[index] for index in range(self._capacity))
+        write_chains(path, buckets, self._capacity, self._size, self._hash_function, chain, self._mask is not None)
+
+    @classmethod
+    def load(cls, path: str, **options) -> "HashMap":
+        """
+        Rebuilds a hash map saved with save. Every entry goes straight back into its saved bucket and chain position
+        with its cached hash; no key is hashed and the table is never resized.
+
+        :param path: The file to read.
+        :param options: Any other keyword arguments for the constructor, such as stats. The chain type defaults to
+        the saved one and a policy must take indices the same way (pow2 or not) as the saved map.
+
+        :return: The loaded hash map.
+        """
+        with ChainSnapshot(path) as snapshot:
+            options['policy'] = snapshot_policy(options.get('policy'), snapshot.pow2)
+            options.setdefault('chain', snapshot.chain)
+            hash_map = cls(1, snapshot.function, **options)
+            # keep the saved capacity even if the policy would round it differently
+            hash_map._capacity = snapshot.capacity
+            hash_map._mask = hash_map._policy.mask(snapshot.capacity)
+            hash_map._buckets = buckets = DynamicArray([EMPTY_BUCKET] * snapshot.capacity)
+            chain, threshold = hash_map._chain, hash_map._treeify_threshold
+            for index, entries in enumerate(snapshot.buckets()):
+                if not entries:
+                    continue
+                if threshold is not None and len(entries) > threshold:
+                    llist = TreeBucket()
+                else:
+                    llist = chain()
+                    # linked lists insert at the head
+                    if chain is LinkedList:
+                        entries.reverse()
+                for key, value, hash in entries:
+                    llist.insert(key, value, hash)
+                buckets[index] = llist
+            hash_map._size = snapshot.size
+            hash_map._chain_counts, hash_map._longest, hash_map._tree_buckets = hash_map._scan()
+        return hash_map
 
     def empty_buckets(self) -> int:
         """
-        Returns a count of the empty buckets in the hash map.
+        Returns a count of the empty buckets in the hash map, from the occupancy counters. During a progressive
+        resize this counts the new buckets, which do not hold the keys still waiting in the old ones yet.
 
         :return: An integer representing the count.
         """
-        total = 0
-        for index in range(self._capacity):
-            if self._buckets[index].length() == 0:
-                total += 1
-        return total
+        return self._chain_counts[0]
+
+    def longest_chain(self) -> int:
+        """
+        Returns the length of the longest chain, from the occupancy counters. During a progressive resize this is the
+        longest chain in either table.
+
+        :return: The number of keys in the fullest bucket.
+        """
+        return max(self._longest, self._old_longest)
+
+    def _scan(self, buckets: DynamicArray = None, capacity: int = None) -> (list, int, int):
+        """
+        Counts the occupancy of a table the slow way, by visiting every bucket.
+
+        :param buckets: The buckets to count, the current ones by default.
+        :param capacity: The number of buckets.
+
+        :return: A tuple (chain length counts, longest chain, tree buckets) in the form of the occupancy counters.
+        """
+        if buckets is None:
+            buckets, capacity = self._buckets, self._capacity
+        counts, longest, trees = [0], 0, 0
+        for index in range(capacity):
+            llist = buckets[index]
+            length = llist.length()
+            while length >= len(counts):
+                counts.append(0)
+            counts[length] += 1
+            longest = max(longest, length)
+            trees += isinstance(llist, TreeBucket)
+        return counts, longest, trees
+
+    def verify(self) -> None:
+        """
+        Checks the size and the occupancy counters against a full scan of the buckets (and the old buckets of a
+        progressive resize). Called after every change in debug mode.
+        Raises AssertionError describing the first counter that does not match.
+        """
+        size = sum(self._buckets[index].length() for index in range(self._capacity))
+        if self._old_table is not None:
+            size += sum(self._old_table[index].length() for index in range(self._old_capacity))
+        if size != self._size:
+            raise AssertionError(f"size is {self._size} but the buckets hold {size} keys")
+        tables = [('', self._scan(), (self._chain_counts, self._longest, self._tree_buckets))]
+        if self._old_table is not None:
+            tables.append(('old ', self._scan(self._old_table, self._old_capacity),
+                           (self._old_counts, self._old_longest, self._old_trees)))
+        for table, (counts, longest, trees), (kept_counts, kept_longest, kept_trees) in tables:
+            # the counters may carry trailing zero counts for lengths no bucket has anymore
+            if kept_counts[:len(counts)] != counts or any(kept_counts[len(counts):]):
+                raise AssertionError(f"{table}chain length counts are {kept_counts} but the buckets have {counts}")
+            if longest != kept_longest:
+                raise AssertionError(f"{table}longest chain is {kept_longest} but the buckets have {longest}")
+            if trees != kept_trees:
+                raise AssertionError(f"{table}tree bucket count is {kept_trees} but the buckets have {trees}")
 
     def table_load(self) -> float:
         """
@@ -133,57 +380,193 @@ class HashMap:
 
     def clear(self) -> None:
         """
-        Clears the hash map of all values but does not alter the capacity. Replaces the data with new empty LinkedLists.
+        Clears the hash map of all values but does not alter the capacity. Every bucket goes back to the shared empty
+        bucket, so no chains are allocated.
         """
-        for index in range(self._buckets.length()):
-            self._buckets[index] = LinkedList()
+        self._buckets = DynamicArray([EMPTY_BUCKET] * self._capacity)
+        self._old_table = None
         self._size = 0
+        self._reset_counts()
+        self._reset_old_counts()
+
+    def _reset_counts(self) -> None:
+        """
+        Resets the occupancy counters for a table of empty buckets.
+        """
+        self._chain_counts = [self._capacity]
+        self._longest = 0
+        self._tree_buckets = 0
+
+    def _reset_old_counts(self) -> None:
+        """
+        Resets the occupancy counters of the old buckets for when no progressive resize is running.
+        """
+        self._old_counts = [0]
+        self._old_longest = 0
+        self._old_trees = 0
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes the hash map capacity to the passed value. Rehashes existing values
+        Resizes the hash map capacity to the passed value. Relinks the existing nodes straight into the new buckets by
+        their cached hashes, finishing any progressive resize first. The time taken is available from
+        get_last_resize_time().
 
         :param new_capacity: An integer for the new capacity of the table.
         """
         if new_capacity < 1:
             return
-        # save original map and capacity
-        original_map = DynamicArray()
-        for index in range(self._buckets.length()):
-            original_map.append(self._buckets[index])
-        # reset the current map (for rehashing)
-        self._buckets = DynamicArray()
-        self._size = 0
-        # get the new capacity then update
-        if self._is_prime(new_capacity):
-            self._capacity = new_capacity
-        else:
-            self._capacity = self._next_prime(new_capacity)
-        # fill in the new hashmap with empty linked lists
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
-        # populate the new hash map with the original values (now rehashed)
+        self._finish_rehash()
+        start = perf_counter()
+        old_capacity = self._capacity
+        capacity = self._fit_capacity(new_capacity)
+        original_map = self._buckets
+        self._buckets = DynamicArray([EMPTY_BUCKET] * capacity)
+        self._capacity = capacity
+        self._mask = self._policy.mask(capacity)
+        self._reset_counts()
         for index in range(original_map.length()):
             llist = original_map[index]
             if llist.length() != 0:
-                for node in llist:
-                    self.put(node.key, node.value)
+                self._move_chain(llist)
+        self._last_resize_time = perf_counter() - start
+        if self._stats is not None:
+            self._stats.record_resize(self._size, self._last_resize_time, old_capacity, capacity)
+        if self._debug:
+            self.verify()
+
+    def _move_chain(self, llist) -> None:
+        """
+        Moves every entry of a chain from an old table into the current buckets by their cached hashes. The entries
+        are grouped by their new bucket first. Linked nodes are relinked without copying them, the entries of trees
+        and array chains are copied, and a bucket that would grow past the treeify threshold is built as a tree from
+        all of its entries at once.
+
+        :param llist: The chain to move. A linked chain must not be used afterwards.
+        """
+        buckets, mask, chain = self._buckets, self._mask, self._chain
+        capacity, threshold = self._capacity, self._treeify_threshold
+        groups = {}
+        for node in llist:
+            new_index = node.hash % capacity if mask is None else node.hash & mask
+            groups.setdefault(new_index, []).append(node)
+        relink = type(llist) is LinkedList
+        for index, nodes in groups.items():
+            bucket = buckets[index]
+            length = bucket.length()
+            if threshold is not None and length + len(nodes) > threshold and not isinstance(bucket, TreeBucket):
+                # swap a chain that would get too long for a tree holding its entries and the moved ones
+                buckets[index] = TreeBucket.from_nodes([*bucket, *nodes])
+                self._tree_buckets += 1
+            else:
+                if bucket is EMPTY_BUCKET:
+                    bucket = buckets[index] = chain()
+                if relink and type(bucket) is LinkedList:
+                    # relink the nodes of a linked chain into their new bucket without copying them
+                    for node in nodes:
+                        bucket.insert_node(node)
+                else:
+                    for node in nodes:
+                        bucket.insert(node.key, node.value, node.hash)
+            self._count_chain(length, length + len(nodes))
 
-    def get(self, key: str):
+    def _begin_rehash(self) -> None:
+        """
+        Keeps the buckets and their occupancy counters as the old table of a progressive resize and allocates empty
+        buckets for the new capacity.
+        """
+        self._old_table, self._buckets = self._buckets, DynamicArray([EMPTY_BUCKET] * self._capacity)
+        # the counters follow the buckets into the old table
+        self._old_counts, self._old_longest, self._old_trees = self._chain_counts, self._longest, self._tree_buckets
+        self._reset_counts()
+
+    def _migrate(self, count: int, hash: int = None) -> None:
+        """
+        Advances a progressive resize. Moves the old bucket a key hashes to, so the caller only has to look at the
+        current buckets, then up to count more old buckets in order, visiting at most REHASH_EMPTY_VISITS empty ones
+        per bucket. Ends the resize once every old bucket has been moved.
+
+        :param count: The number of old buckets to move.
+        :param hash: The full hash of the key the caller is about to look up, insert or remove, if any.
+        """
+        start = perf_counter()
+        old = self._old_table
+        if hash is not None:
+            self._move_old_bucket(hash % self._old_capacity if self._old_mask is None else hash & self._old_mask)
+        index, end, visits = self._rehash_index, self._old_capacity, count * REHASH_EMPTY_VISITS
+        while count and visits and index < end:
+            if old[index].length() != 0:
+                self._move_old_bucket(index)
+                count -= 1
+            else:
+                visits -= 1
+            index += 1
+        self._rehash_index = index
+        self._rehash_seconds += perf_counter() - start
+        if index == end:
+            self._end_rehash()
+
+    def _move_old_bucket(self, index: int) -> None:
+        """
+        Moves one bucket of a progressive resize's old table into the current buckets and releases it.
+
+        :param index: The index of the bucket in the old table.
+        """
+        llist = self._old_table[index]
+        length = llist.length()
+        if length != 0:
+            self._rehash_moved += length
+            # the old bucket leaves its length for the empty ones
+            counts = self._old_counts
+            counts[length] -= 1
+            counts[0] += 1
+            while self._old_longest and counts[self._old_longest] == 0:
+                self._old_longest -= 1
+            self._old_trees -= isinstance(llist, TreeBucket)
+            self._move_chain(llist)
+            self._old_table[index] = EMPTY_BUCKET
+
+    def stats(self) -> dict:
+        """
+        Reports the health of the table, including a histogram of chain lengths. Lookup and resize counters are
+        included when the map was created with stats=True. During a progressive resize the chains of both tables are
+        reported, and empty_buckets counts the new buckets only; pending_buckets is the number of old buckets that
+        still hold keys.
+
+        :return: A dict of plain values, ready to export as metrics.
+        """
+        lengths = {length: count for length, count in enumerate(self._chain_counts) if count}
+        for length in range(1, len(self._old_counts)):
+            if self._old_counts[length]:
+                lengths[length] = lengths.get(length, 0) + self._old_counts[length]
+        pending = self._old_capacity - self._old_counts[0] if self._old_table is not None else 0
+        used = self._capacity - self._chain_counts[0] + pending
+        result = {
+            'size': self._size,
+            'capacity': self._capacity,
+            'table_load': self.table_load(),
+            'empty_buckets': self._chain_counts[0],
+            'pending_buckets': pending,
+            'chain_lengths': dict(sorted(lengths.items())),
+            'longest_chain': self.longest_chain(),
+            'average_chain_length': self._size / used if used else 0.0,
+            'tree_buckets': self._tree_buckets + self._old_trees,
+        }
+        if self._stats is not None:
+            result.update(self._stats.as_dict())
+        return result
+
+    def get(self, key: str, default: object = None):
         """
         Returns the value associated with the passed key.
 
         :param key: The string for a key to search for
+        :param default: The value to return if the key isn't found.
         """
+        node = self._find_node(key, self._hash_function(key))
         # exit if that key isn't found
-        if not self.contains_key(key):
-            return
-        else:
-            index = self._hash_function(key) % self._capacity
-            for node in self._buckets[index]:
-                if node.key == key:
-                    return node.value
-                node.next
+        if node is None:
+            return default
+        return node.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -193,10 +576,27 @@ class HashMap:
 
         :return: True if found, false if not.
         """
-        index = self._hash_function(key) % self._capacity
-        if self._buckets[index].contains(key):
-            return True
-        return False
+        return self._find_node(key, self._hash_function(key)) is not None
+
+    def _find_node(self, key: str, hash: int):
+        """
+        Looks up the node for a key on behalf of get and contains_key, applying the reorder policy to its chain and
+        counting the comparisons when stats are on.
+
+        :param key: The key to search for.
+        :param hash: The full hash of the key.
+
+        :return: The node holding the key, or None.
+        """
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, hash)
+        llist = self._buckets[self._index(hash)]
+        if self._reorder is None and self._stats is None:
+            return llist.contains(key, hash)
+        node, comparisons = llist.find(key, hash, self._reorder)
+        if self._stats is not None:
+            self._stats.record_lookup(node is not None, comparisons=comparisons)
+        return node
 
     def remove(self, key: str) -> None:
         """
@@ -204,10 +604,118 @@ class HashMap:
 
         :param key: The key of the key/value pair to remove.
         """
-        index = self._hash_function(key) % self._capacity
-        if self.contains_key(key):
-            self._buckets[index].remove(key)
-            self._size -= 1
+        self.pop(key)
+
+    def pop(self, key: str, default: object = None):
+        """
+        Removes a key/value pair from the hash map and returns its value.
+
+        :param key: The key of the key/value pair to remove.
+        :param default: The value to return if the key isn't found.
+
+        :return: The removed value, or default.
+        """
+        hash = self._hash_function(key)
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, hash)
+        index = self._index(hash)
+        node = self._buckets[index].pop(key, hash)
+        if self._stats is not None:
+            self._stats.record_lookup(node is not None)
+        if node is None:
+            return default
+        self._removed(index)
+        if self._debug:
+            self.verify()
+        return node.value
+
+    def _shrink_bucket(self, index: int) -> None:
+        """
+        Tidies a bucket after a key was removed from it: an empty bucket is released and a tree that got short enough
+        turns back into a chain.
+
+        :param index: The index of the bucket.
+        """
+        llist = self._buckets[index]
+        # release a bucket that became empty
+        if llist.length() == 0:
+            self._buckets[index] = EMPTY_BUCKET
+        # turn a tree that got short enough back into a chain
+        elif isinstance(llist, TreeBucket) and llist.length() <= self._untreeify_threshold:
+            self._buckets[index] = llist.to_linked_list() if self._chain is LinkedList else \
+                self._chain.from_nodes(llist)
+        if isinstance(llist, TreeBucket) and self._buckets[index] is not llist:
+            self._tree_buckets -= 1
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value of a key, starting from 0 if the key isn't in the hash map. Hashes the key and walks
+        its chain once.
+
+        :param key: The key to count.
+        :param delta: The amount to add.
+
+        :return: The new value.
+        """
+        return self._upsert(key, lambda value: delta if value is None else value + delta)[0]
+
+    def setdefault(self, key: str, default: object = None):
+        """
+        Returns the value of a key, first adding the key with the default value if it isn't in the hash map.
+
+        :param key: The key to look up.
+        :param default: The value to add if the key isn't found. A default of None adds nothing.
+
+        :return: The value of the key after the call.
+        """
+        return self._upsert(key, lambda value: default if value is None else value)[0]
+
+    def compute(self, key: str, function: callable):
+        """
+        Replaces the value of a key with function(key, current value), where the current value is None if the key
+        isn't in the hash map. A result of None removes the key.
+
+        :param key: The key to update.
+        :param function: Called as function(key, value) to produce the new value.
+
+        :return: The new value, or None if the key was removed or stayed absent.
+        """
+        return self._upsert(key, lambda value: function(key, value))[0]
+
+    def _upsert(self, key: str, function: callable) -> (object, bool):
+        """
+        Replaces the value of a key with function(value) in place, with a single hash and chain walk. The function is
+        called with None for a missing key; a result of None removes the key or leaves it absent.
+
+        :param key: The key to update.
+        :param function: Called with the current value (or None) to produce the new value.
+
+        :return: A tuple (the new value, True if the key was already in the hash map).
+        """
+        hash = self._hash_function(key)
+        if self._old_table is not None:
+            self._migrate(self._rehash_step, hash)
+        index = self._index(hash)
+        llist = self._buckets[index]
+        # allocate the bucket on its first insert
+        if llist is EMPTY_BUCKET:
+            llist = self._buckets[index] = self._chain()
+        value, found = llist.update(key, function, hash)
+        if value is None:
+            if found:
+                llist.remove(key, hash)
+                self._removed(index)
+            else:
+                # release a bucket allocated for nothing
+                self._shrink_bucket(index)
+        elif not found:
+            self._inserted(index)
+            # only an insert can grow the table, at the same load put grows at
+            if (self._size - 1) / self._capacity >= self._max_load:
+                self._resize_to(self._policy.grow(self._capacity))
+        if self._debug:
+            self.verify()
+        return value, found
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -217,12 +725,29 @@ class HashMap:
         """
         # go through each node and add the key/values to the results array.
         results = DynamicArray()
-        for index in range(self._buckets.length()):
-            if self._buckets[index].length() > 0:
-                for node in self._buckets[index]:
-                    results.append((node.key, node.value))
+        for pair in self._iter_items():
+            results.append(pair)
         return results
 
+    def _iter_items(self):
+        """
+        Generates the (key, value) pairs straight from the buckets. Finishes a progressive resize first.
+        """
+        self._finish_rehash()
+        buckets = self._buckets
+        for index in range(buckets.length()):
+            llist = buckets[index]
+            if llist.length() > 0:
+                yield from llist.items()
+
+    def __iter__(self) -> "HashMapIterator":
+        """
+        Creates an independent iterator over the nodes of the HashMap. Finishes a progressive resize first.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets)
+
+
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
     Finds the mode(s) and frequency of a dynamic array.
@@ -234,13 +759,21 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
     # map passed values to a hash map O(n)
     map = HashMap()
-    results = DynamicArray()
     map.resize_table(da.length())
     for index in range(da.length()):
-        if not map.contains_key(da[index]):
-            map.put(da[index], 1)
-        else:
-            map.put(da[index], map.get(da[index]) + 1)
+        map.increment(da[index])
+    return _modes(map)
+
+
+def _modes(map: HashMap) -> (DynamicArray, int):
+    """
+    Finds the values with the highest count in a hash map of value -> count.
+
+    :param map: The counts.
+
+    :return: A tuple (dynamic array of every value at the maximum count, the maximum count).
+    """
+    results = DynamicArray()
     # extract all the nodes from the hash map and establish the maximum frequency O(n)
     map_data = map.get_keys_and_values()
     max_freq = 1
@@ -254,6 +787,55 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
 
     return results, max_freq
 
+
+def _count_shard(values: list) -> list:
+    """
+    Counts one shard of find_mode_parallel's input in a worker process.
+
+    :param values: The shard, as a list.
+
+    :return: A list of (value, count) tuples in the order each value first occurs in the shard.
+    """
+    counts = HashMap()
+    counts.resize_table(len(values))
+    order = []
+    for value in values:
+        if counts.increment(value) == 1:
+            order.append(value)
+    return [(value, counts.get(value)) for value in order]
+
+
+def find_mode_parallel(da: DynamicArray, workers: int = None,
+                       threshold: int = PARALLEL_THRESHOLD) -> (DynamicArray, int):
+    """
+    Finds the mode(s) and frequency of a dynamic array like find_mode, counting contiguous shards of it in worker
+    processes and merging the partial counts. The result is the same as find_mode's, including the order of the modes.
+
+    :param da: A dynamic array to find the mode in.
+    :param workers: The number of worker processes, the number of CPUs by default.
+    :param threshold: Arrays shorter than this, or a single worker, use the serial find_mode instead.
+
+    :return: A tuple containing a dynamic array listing all elements that occurred at the mode frequency and the
+    integer frequency that they occurred. (dynamic array, frequency).
+    """
+    length = da.length()
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers < 2 or length == 0 or length < threshold:
+        return find_mode(da)
+    values = to_list(da)
+    size = -(-length // workers)
+    shards = [values[start:start + size] for start in range(0, length, size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(_count_shard, shards))
+    # merging the shards in order inserts every value at its first occurrence in the whole array, exactly as
+    # find_mode does, so the merged map ends up with the same layout
+    map = HashMap()
+    map.resize_table(length)
+    for partial in partials:
+        for value, count in partial:
+            map.increment(value, count)
+    return _modes(map)
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Opt-in instrumentation shared by both hash maps. Counts lookup hits and misses, keeps a histogram of
+#              probe lengths and records every resize, and exports everything as a plain dict for metrics pipelines.
+
+from collections import deque
+
+# the most recent resizes kept in the history
+RESIZE_HISTORY = 32
+
+
+class MapStats:
+    """
+    Counters kept by a hash map created with stats=True. Lookups are the reads of a key (get, contains_key and pop);
+    puts and other writes are not counted.
+    Supported methods are: record_lookup, record_resize, reset, as_dict
+    """
+
+    def __init__(self, comparisons: bool = False) -> None:
+        """
+        Initialize all counters to zero. comparisons is True for maps that report how many keys their lookups
+        compared, which adds average_comparisons_per_hit to as_dict.
+        """
+        self.comparisons = comparisons
+        self.reset()
+
+    def reset(self) -> None:
+        """Set all counters back to zero."""
+        self.hits = 0
+        self.misses = 0
+        # key comparisons made by the successful chain lookups that counted them, and how many of those there were
+        self.hit_comparisons = 0
+        self.compared_hits = 0
+        # probe length -> number of lookups that needed that many probes
+        self.probe_lengths = {}
+        self.resizes = 0
+        self.shrinks = 0
+        self.rehashed_entries = 0
+        self.resize_seconds = 0.0
+        # (old capacity, new capacity, entries moved, seconds) of the most recent resizes
+        self.resize_history = deque(maxlen=RESIZE_HISTORY)
+
+    def record_lookup(self, found: bool, probes: int = None, comparisons: int = None) -> None:
+        """
+        Count a key lookup and, for open addressing, how many slots it probed.
+        For separate chaining, comparisons is the number of chain nodes a lookup compared.
+        """
+        if found:
+            self.hits += 1
+            if comparisons is not None:
+                self.hit_comparisons += comparisons
+                self.compared_hits += 1
+        else:
+            self.misses += 1
+        if probes is not None:
+            self.probe_lengths[probes] = self.probe_lengths.get(probes, 0) + 1
+
+    def record_resize(self, entries: int, seconds: float, old_capacity: int = None, new_capacity: int = None) -> None:
+        """
+        Count a resize that moved the given number of entries. With the capacities given, it is also added to the
+        history and counted as a shrink if the capacity went down.
+        """
+        self.resizes += 1
+        self.rehashed_entries += entries
+        self.resize_seconds += seconds
+        if old_capacity is not None:
+            if new_capacity < old_capacity:
+                self.shrinks += 1
+            self.resize_history.append((old_capacity, new_capacity, entries, seconds))
+
+    def as_dict(self) -> dict:
+        """Return the counters as a dict of plain values."""
+        lookups = self.hits + self.misses
+        result = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'resizes': self.resizes,
+            'shrinks': self.shrinks,
+            'rehashed_entries': self.rehashed_entries,
+            'resize_seconds': self.resize_seconds,
+            'resize_history': list(self.resize_history),
+        }
+        if self.comparisons:
+            compared = self.compared_hits
+            result['average_comparisons_per_hit'] = self.hit_comparisons / compared if compared else 0.0
+        if self.probe_lengths:
+            probes = sum(length * count for length, count in self.probe_lengths.items())
+            result['probe_lengths'] = dict(sorted(self.probe_lengths.items()))
+            result['average_probe_length'] = probes / sum(self.probe_lengths.values())
+            result['max_probe_length'] = max(self.probe_lengths)
+        return result
@@ -0,0 +1,55 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Lazy keys(), values() and items() views shared by both hash maps. A view holds no copy of the data;
+#              every iteration streams pairs straight from the map's buckets through its _iter_items() generator.
+
+
+class MapView:
+    """
+    Base class for the views. Each iteration starts a new, independent pass over the map.
+    Like dict views, a view reflects later changes to the map, and the map must not be resized mid-iteration.
+    """
+
+    def __init__(self, hash_map) -> None:
+        """Initialize a view over a hash map."""
+        self._map = hash_map
+
+    def __len__(self) -> int:
+        """Return the number of pairs in the map."""
+        return self._map.get_size()
+
+    def __iter__(self):
+        """Return a generator over the view's elements."""
+        raise NotImplementedError
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return f"{type(self).__name__}({list(self)})"
+
+
+class KeysView(MapView):
+    """Lazy view of a map's keys."""
+
+    def __iter__(self):
+        """Return a generator over the keys."""
+        return (key for key, _ in self._map._iter_items())
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key is in the map."""
+        return self._map.contains_key(key)
+
+
+class ValuesView(MapView):
+    """Lazy view of a map's values."""
+
+    def __iter__(self):
+        """Return a generator over the values."""
+        return (value for _, value in self._map._iter_items())
+
+
+class ItemsView(MapView):
+    """Lazy view of a map's (key, value) pairs."""
+
+    def __iter__(self):
+        """Return a generator over the (key, value) tuples."""
+        return self._map._iter_items()
@@ -0,0 +1,461 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Read-only open addressing hash map backed by a memory-mapped file. The open addressing HashMap writes
+#              its table slot for slot with save(); MappedHashMap probes the file in place, reading cached
+#              hashes, heap offsets and state bytes straight from the mapping and decoding only the value it returns.
+#              Processes that open the same file share its pages through the OS page cache.
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from contextlib import suppress
+
+from map_views import ItemsView, KeysView, ValuesView
+from oa_storage import EMPTY, LIVE, TOMBSTONE
+from probing import PROBING, DoubleHashing, get_strategy
+from a6_include import (DynamicArray, HashEntry, HASH_FUNCTIONS, hash_function_2,
+                        hash_function_name)
+
+# File layout, every section starting on an 8 byte boundary:
+#   header    HEADER below
+#   hashes    capacity unsigned 64 bit cached hashes, 0 for slots that are not live
+#   offsets   capacity unsigned 64 bit offsets of the live slots' heap records from the start of the file
+#   states    capacity state bytes (EMPTY, LIVE or TOMBSTONE)
+#   heap      one record per live slot: ENTRY, then the UTF-8 key, then the encoded value
+# The slot arrays use the byte order of the machine that wrote them; the header records which one it was.
+MAGIC = b'CS261OA\0'
+VERSION = 2
+# magic, version, flags, 5 reserved bytes, capacity, size, tombstones, heap offset, heap length, hash function name,
+# probing name
+HEADER = struct.Struct('<8sHB5xQQQQQ32s16s')
+# key length, value tag, value length
+ENTRY = struct.Struct('<IBI')
+
+# header flags
+FLAG_MASK = 1           # the capacity is a power of two and indices are taken with a mask
+FLAG_BIG_ENDIAN = 2     # the slot arrays are big endian
+
+# value tags
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_BYTES = 6
+
+FLOAT = struct.Struct('<d')
+
+# slots buffered by the writer before they are written to the slot arrays
+CHUNK_SLOTS = 1 << 16
+
+
+def encode_value(value: object) -> (int, bytes):
+    """
+    Encode a value for a heap record.
+    Supports None, bools, ints of any size, floats, strings and bytes; raises TypeError for anything else.
+
+    :return: A tuple (value tag, encoded bytes).
+    """
+    if value is None:
+        return TAG_NONE, b''
+    if value is True or value is False:
+        return (TAG_TRUE if value else TAG_FALSE), b''
+    if isinstance(value, int):
+        return TAG_INT, value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+    if isinstance(value, float):
+        return TAG_FLOAT, FLOAT.pack(value)
+    if isinstance(value, str):
+        return TAG_STR, value.encode()
+    if isinstance(value, (bytes, bytearray)):
+        return TAG_BYTES, bytes(value)
+    raise TypeError(f"cannot store a value of type {type(value).__name__}")
+
+
+def decode_value(tag: int, data) -> object:
+    """Decode the bytes (or memoryview) of a value encoded by encode_value."""
+    if tag == TAG_STR:
+        return str(data, 'utf-8')
+    if tag == TAG_INT:
+        return int.from_bytes(data, 'little', signed=True)
+    if tag == TAG_NONE:
+        return None
+    if tag == TAG_FALSE or tag == TAG_TRUE:
+        return tag == TAG_TRUE
+    if tag == TAG_FLOAT:
+        return FLOAT.unpack(data)[0]
+    if tag == TAG_BYTES:
+        return bytes(data)
+    raise ValueError(f"unknown value tag {tag}")
+
+
+def encode_entry(key: str, value: object) -> bytes:
+    """Return the heap record of a key/value pair."""
+    encoded = key.encode()
+    tag, data = encode_value(value)
+    return ENTRY.pack(len(encoded), tag, len(data)) + encoded + data
+
+
+def probing_name(strategy) -> str:
+    """
+    Return the name a probing strategy is saved under. Only the built-in strategies can be saved, since a reader must
+    rebuild the exact probe sequence from the name alone.
+    """
+    if type(strategy) is not PROBING.get(strategy.name) or \
+            (isinstance(strategy, DoubleHashing) and strategy.step_function is not hash_function_2):
+        raise ValueError(f"probing strategy {strategy} cannot be saved, expected one of {tuple(PROBING)}")
+    return strategy.name
+
+
+def _align(offset: int) -> int:
+    """Round a file offset up to a multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def write_table(path: str, slots, capacity: int, function: callable, probing, pow2: bool) -> None:
+    """
+    Writes an open addressing table to a file in the layout MappedHashMap reads. The slots are streamed to the file
+    in chunks, so only CHUNK_SLOTS of them are ever held in memory. The file is written to a uniquely named
+    temporary file next to the path and then renamed over it, so processes that have the old file mapped keep reading
+    it undisturbed and concurrent saves never mix. A failed write removes the partly written file.
+
+    :param path: The file to write.
+    :param slots: An iterable of exactly capacity (state, key, value, hash) tuples in index order. The key, value and
+    hash of slots that are not live are ignored.
+    :param capacity: The number of slots.
+    :param function: The table's hash function, which must be registered in HASH_FUNCTIONS.
+    :param probing: The table's ProbingStrategy.
+    :param pow2: True if the table takes indices with a mask instead of a modulo.
+    """
+    names = hash_function_name(function).encode(), probing_name(probing).encode()
+    flags = (FLAG_MASK if pow2 else 0) | (FLAG_BIG_ENDIAN if sys.byteorder == 'big' else 0)
+    hashes_start = HEADER.size
+    offsets_start = hashes_start + 8 * capacity
+    states_start = offsets_start + 8 * capacity
+    heap_start = _align(states_start + capacity)
+    # a unique temporary file, so concurrent saves to the same path cannot write over each other's
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with open(descriptor, 'wb') as file:
+            hashes, offsets, states = array('Q'), array('Q'), bytearray()
+            written = size = tombstones = 0
+            heap_end = heap_start
+
+            def flush():
+                # write the buffered slots to the three slot arrays, then go back to the end of the heap
+                nonlocal written
+                file.seek(hashes_start + 8 * written)
+                file.write(hashes)
+                file.seek(offsets_start + 8 * written)
+                file.write(offsets)
+                file.seek(states_start + written)
+                file.write(states)
+                written += len(states)
+                del hashes[:], offsets[:], states[:]
+                file.seek(heap_end)
+
+            file.seek(heap_start)
+            for state, key, value, hash in slots:
+                if state == LIVE:
+                    record = encode_entry(key, value)
+                    try:
+                        hashes.append(hash)
+                    except OverflowError:
+                        raise ValueError(f"the hash of {key!r} does not fit in 64 bits") from None
+                    offsets.append(heap_end)
+                    file.write(record)
+                    heap_end += len(record)
+                    size += 1
+                else:
+                    hashes.append(0)
+                    offsets.append(0)
+                    tombstones += state == TOMBSTONE
+                states.append(state)
+                if len(states) == CHUNK_SLOTS:
+                    flush()
+            flush()
+            if written != capacity:
+                raise ValueError(f"expected {capacity} slots, got {written}")
+            # pad an empty heap so the file is never shorter than its slot arrays
+            file.truncate(heap_end)
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, VERSION, flags, capacity, size, tombstones, heap_start,
+                                   heap_end - heap_start, *names))
+    except BaseException:
+        # never leave a partly written file behind
+        with suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
+    os.replace(temporary, path)
+
+
+class MappedHashMap:
+    """
+    Read-only view of an open addressing table file written by HashMap.save.
+    Supported methods are: get, contains_key, get_size, get_capacity, table_load, empty_buckets, get_tombstones,
+    get_keys_and_values, keys, values, items, iterator, close
+    Opening a file maps it without reading it; lookups probe the mapping directly, so a process only ever pages in
+    the slots and records its lookups touch. Use it as a context manager, or call close(), to unmap the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map a table file. Raises ValueError if the file is not a table written by this version, is truncated, was
+        written on a machine with the other byte order, or names an unknown hash function or probing strategy.
+        """
+        with open(path, 'rb') as file:
+            length = os.fstat(file.fileno()).st_size
+            if length < HEADER.size:
+                raise ValueError(f"{path} is not a hash map table file")
+            # the mapping stays valid after the file is closed
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, capacity, size, tombstones, heap_start, heap_length, function, probing = \
+            HEADER.unpack_from(self._mmap)
+        try:
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a hash map table file")
+            if version != VERSION:
+                raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+            if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == 'big'):
+                raise ValueError(f"{path} was written on a machine with the other byte order")
+            # the slot arrays must fit before the heap, and the file must hold them and the whole heap
+            if heap_start < HEADER.size + 17 * capacity or length < heap_start + heap_length:
+                raise ValueError(f"{path} is truncated or corrupt")
+            function = function.rstrip(b'\0').decode()
+            if function not in HASH_FUNCTIONS:
+                raise ValueError(f"{path} uses the unknown hash function {function!r}")
+            probing = probing.rstrip(b'\0').decode()
+            if probing not in PROBING:
+                raise ValueError(f"{path} uses the unknown probing strategy {probing!r}")
+            self._probing = get_strategy(probing)
+        except ValueError:
+            self._mmap.close()
+            raise
+        self._capacity = capacity
+        self._size = size
+        self._tombstones = tombstones
+        self._mask = capacity - 1 if flags & FLAG_MASK else None
+        self._hash_function = HASH_FUNCTIONS[function]
+
+        # zero-copy views of the slot arrays
+        self._view = memoryview(self._mmap)
+        offsets_start = HEADER.size + 8 * capacity
+        self._hashes = self._view[HEADER.size:offsets_start].cast('Q')
+        self._offsets = self._view[offsets_start:offsets_start + 8 * capacity].cast('Q')
+        self._states = self._view[offsets_start + 8 * capacity:offsets_start + 9 * capacity]
+
+    def close(self) -> None:
+        """
+        Unmaps the file. The map cannot be used afterwards.
+        """
+        if self._view is None:
+            return
+        for view in (self._hashes, self._offsets, self._states, self._view):
+            view.release()
+        self._view = None
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmap the file at the end of a with statement."""
+        self.close()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output, in the same format as the open addressing HashMap
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._entry(i)) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_hash_function(self) -> callable:
+        """
+        Return the hash function the table was saved with
+        """
+        return self._hash_function
+
+    def get_probing(self):
+        """
+        Return the ProbingStrategy the table was saved with
+        """
+        return self._probing
+
+    def is_pow2(self) -> bool:
+        """
+        Return True if the table takes indices with a mask instead of a modulo
+        """
+        return self._mask is not None
+
+    def get_tombstones(self) -> int:
+        """
+        Return the number of tombstones the table was saved with
+        """
+        return self._tombstones
+
+    def table_load(self) -> float:
+        """
+        Returns the current table load factor.
+
+        :return: A float representing the load factor.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty buckets. Tombstone values are considered empty.
+        """
+        return self._capacity - self._size
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str) -> int:
+        """
+        Probes the mapped table for a key, comparing cached hashes before the key bytes.
+
+        :param key: The key to search for.
+
+        :return: The file offset of the key's heap record, or -1 if the key is not in the table.
+        """
+        hash = self._hash_function(key)
+        encoded = key.encode()
+        view, states, hashes = self._view, self._states, self._hashes
+        for index in self._probing.probe(hash, key, self._capacity, self._mask):
+            state = states[index]
+            if state == EMPTY:
+                return -1
+            if state == LIVE and hashes[index] == hash:
+                offset = self._offsets[index]
+                key_length = ENTRY.unpack_from(view, offset)[0]
+                start = offset + ENTRY.size
+                if key_length == len(encoded) and view[start:start + key_length] == encoded:
+                    return offset
+        return -1
+
+    def _record(self, offset: int) -> (str, object):
+        """
+        Decodes the heap record at a file offset.
+
+        :return: A tuple (key, value).
+        """
+        view = self._view
+        key_length, tag, value_length = ENTRY.unpack_from(view, offset)
+        start = offset + ENTRY.size
+        return str(view[start:start + key_length], 'utf-8'), \
+            decode_value(tag, view[start + key_length:start + key_length + value_length])
+
+    def _entry(self, index: int) -> HashEntry:
+        """
+        Returns a HashEntry copy of a slot, or None if it is empty.
+
+        :param index: The index of the slot.
+        """
+        state = self._states[index]
+        if state == EMPTY:
+            return None
+        if state == TOMBSTONE:
+            entry = HashEntry(None, None)
+            entry.is_tombstone = True
+            return entry
+        return HashEntry(*self._record(self._offsets[index]), self._hashes[index])
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Get the value associated with a key.
+
+        :param key: The string key to retrieve the associated value.
+        :param default: The value to return if the key isn't found.
+
+        :return: The value.
+        """
+        offset = self._find(key)
+        if offset < 0:
+            return default
+        view = self._view
+        key_length, tag, value_length = ENTRY.unpack_from(view, offset)
+        start = offset + ENTRY.size + key_length
+        return decode_value(tag, view[start:start + value_length])
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a hash map contains a key.
+
+        :param key: A string key to search for in the hash map.
+
+        :return: True if found, false if not.
+        """
+        return self._size > 0 and self._find(key) >= 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Gets all the key/value pairs in the hash map.
+
+        :return: A dynamic array where each index contains a tuple for each key/value pair (key, value).
+        """
+        results = DynamicArray()
+        for pair in self._iter_items():
+            results.append(pair)
+        return results
+
+    def _iter_items(self):
+        """
+        Generates the (key, value) pairs of the live slots in index order.
+        """
+        states, offsets = self._states, self._offsets
+        for index in range(self._capacity):
+            if states[index] == LIVE:
+                yield self._record(offsets[index])
+
+    def _iter_slots(self):
+        """
+        Generates a (state, key, value, hash) tuple for every slot in index order, the inverse of write_table.
+        """
+        states, offsets, hashes = self._states, self._offsets, self._hashes
+        for index in range(self._capacity):
+            state = states[index]
+            if state == LIVE:
+                yield (state, *self._record(offsets[index]), hashes[index])
+            else:
+                yield state, None, None, None
+
+    def keys(self) -> KeysView:
+        """
+        Returns a lazy view of the keys in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a lazy view of the values in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a lazy view of the (key, value) pairs in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self):
+        """
+        Returns a generator over HashEntry copies of the live slots, like the open addressing HashMap's iterator.
+        """
+        return (self._entry(index) for index in range(self._capacity) if self._states[index] == LIVE)
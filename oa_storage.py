@@ -0,0 +1,238 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Slot storage for the open addressing hash map. EntryTable keeps a DynamicArray of HashEntry objects,
+#              CompactTable keeps parallel arrays of keys, values, cached hashes and a byte per slot for its state.
+#              Both expose the same slot operations so the hash map's probing logic works with either of them.
+
+from array import array
+
+from a6_include import DynamicArray, HashEntry
+
+# slot states
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# shared tombstone left behind in slots whose entry has been adopted by another table
+_VACATED = HashEntry(None, None)
+_VACATED.is_tombstone = True
+
+
+class EntryTable:
+    """
+    Slots stored as a DynamicArray holding None or a HashEntry.
+    Supported methods are:
+    find, first_empty, state, entry, key_at, value_at, hash_at, store, set_value, bury, vacate, erase, adopt, clear
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize a table with the given number of empty slots."""
+        self.capacity = capacity
+        self._buckets = DynamicArray([None] * capacity)
+
+    def find(self, key: str, hash: int, probe) -> (int, bool, int):
+        """
+        Walk the probe sequence until the key's live slot or an empty slot is reached.
+        Return (index, True, steps) for a match, otherwise (first tombstone or empty index, False, steps), where steps
+        is how far along the sequence the index is.
+        """
+        buckets = self._buckets
+        available = available_steps = None
+        for steps, index in enumerate(probe):
+            entry = buckets[index]
+            if entry is None:
+                if available is None:
+                    return index, False, steps
+                return available, False, available_steps
+            if entry.is_tombstone:
+                if available is None:
+                    available, available_steps = index, steps
+            elif entry.hash == hash and entry.key == key:
+                return index, True, steps
+        return available, False, available_steps
+
+    def first_empty(self, probe) -> (int, int):
+        """
+        Return the first empty index of the probe sequence, ignoring what is stored before it, along with how many
+        steps along the sequence it is.
+        """
+        buckets = self._buckets
+        for steps, index in enumerate(probe):
+            if buckets[index] is None:
+                return index, steps
+
+    def state(self, index: int) -> int:
+        """Return the state of a slot (EMPTY, LIVE or TOMBSTONE)."""
+        entry = self._buckets[index]
+        if entry is None:
+            return EMPTY
+        return TOMBSTONE if entry.is_tombstone else LIVE
+
+    def entry(self, index: int) -> HashEntry:
+        """Return the HashEntry stored in a slot, or None if it is empty."""
+        return self._buckets[index]
+
+    def key_at(self, index: int) -> str:
+        """Return the key stored in a slot."""
+        return self._buckets[index].key
+
+    def value_at(self, index: int) -> object:
+        """Return the value stored in a slot."""
+        return self._buckets[index].value
+
+    def hash_at(self, index: int) -> int:
+        """Return the cached hash stored in a slot."""
+        return self._buckets[index].hash
+
+    def store(self, index: int, key: str, value: object, hash: int) -> None:
+        """Store a new live entry in a slot."""
+        self._buckets[index] = HashEntry(key, value, hash)
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value of a live slot."""
+        self._buckets[index].value = value
+
+    def bury(self, index: int) -> None:
+        """Turn a live slot into a tombstone."""
+        self._buckets[index].is_tombstone = True
+
+    def vacate(self, index: int) -> None:
+        """Turn a slot into a tombstone without touching its entry, which another table may have adopted."""
+        self._buckets[index] = _VACATED
+
+    def erase(self, index: int) -> None:
+        """Turn a slot back into an empty slot."""
+        self._buckets[index] = None
+
+    def adopt(self, source: "EntryTable", source_index: int, index: int) -> None:
+        """Move the entry in a slot of another table into a slot of this one without copying it."""
+        self._buckets[index] = source._buckets[source_index]
+
+    def clear(self) -> None:
+        """Empty every slot."""
+        for index in range(self.capacity):
+            self._buckets[index] = None
+
+
+class CompactTable:
+    """
+    Slots stored as parallel arrays: keys, values, cached hashes and one state byte per slot.
+    No per-entry objects are kept; entry() builds a HashEntry on demand for printing and iteration.
+    Supports the same methods as EntryTable.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize a table with the given number of empty slots."""
+        self.capacity = capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        # hashes are unboxed unsigned 64 bit integers until a hash function returns one that does not fit
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+
+    def find(self, key: str, hash: int, probe) -> (int, bool, int):
+        """
+        Walk the probe sequence until the key's live slot or an empty slot is reached.
+        Return (index, True, steps) for a match, otherwise (first tombstone or empty index, False, steps), where steps
+        is how far along the sequence the index is.
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        available = available_steps = None
+        for steps, index in enumerate(probe):
+            state = states[index]
+            if state == EMPTY:
+                if available is None:
+                    return index, False, steps
+                return available, False, available_steps
+            if state == TOMBSTONE:
+                if available is None:
+                    available, available_steps = index, steps
+            elif hashes[index] == hash and keys[index] == key:
+                return index, True, steps
+        return available, False, available_steps
+
+    def first_empty(self, probe) -> (int, int):
+        """
+        Return the first empty index of the probe sequence, ignoring what is stored before it, along with how many
+        steps along the sequence it is.
+        """
+        states = self._states
+        for steps, index in enumerate(probe):
+            if states[index] == EMPTY:
+                return index, steps
+
+    def state(self, index: int) -> int:
+        """Return the state of a slot (EMPTY, LIVE or TOMBSTONE)."""
+        return self._states[index]
+
+    def entry(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of a slot, or None if it is empty."""
+        state = self._states[index]
+        if state == EMPTY:
+            return None
+        entry = HashEntry(self._keys[index], self._values[index], self._hashes[index])
+        entry.is_tombstone = state == TOMBSTONE
+        return entry
+
+    def key_at(self, index: int) -> str:
+        """Return the key stored in a slot."""
+        return self._keys[index]
+
+    def value_at(self, index: int) -> object:
+        """Return the value stored in a slot."""
+        return self._values[index]
+
+    def hash_at(self, index: int) -> int:
+        """Return the cached hash stored in a slot."""
+        return self._hashes[index]
+
+    def _set_hash(self, index: int, hash: int) -> None:
+        """Cache a hash, switching to a list of Python integers if it does not fit in 64 bits."""
+        try:
+            self._hashes[index] = hash
+        except OverflowError:
+            self._hashes = list(self._hashes)
+            self._hashes[index] = hash
+
+    def store(self, index: int, key: str, value: object, hash: int) -> None:
+        """Store a new live entry in a slot."""
+        self._keys[index] = key
+        self._values[index] = value
+        self._set_hash(index, hash)
+        self._states[index] = LIVE
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value of a live slot."""
+        self._values[index] = value
+
+    def bury(self, index: int) -> None:
+        """Turn a live slot into a tombstone."""
+        self._states[index] = TOMBSTONE
+
+    def vacate(self, index: int) -> None:
+        """Turn a slot into a tombstone and release its key and value."""
+        self._keys[index] = None
+        self._values[index] = None
+        self._states[index] = TOMBSTONE
+
+    def erase(self, index: int) -> None:
+        """Turn a slot back into an empty slot."""
+        self._keys[index] = None
+        self._values[index] = None
+        self._states[index] = EMPTY
+
+    def adopt(self, source: "CompactTable", source_index: int, index: int) -> None:
+        """Copy the live slot of another table into a slot of this one."""
+        self.store(index, source._keys[source_index], source._values[source_index], source._hashes[source_index])
+
+    def clear(self) -> None:
+        """Empty every slot."""
+        self._keys = [None] * self.capacity
+        self._values = [None] * self.capacity
+        self._states = bytearray(self.capacity)
+
+
+STORAGE = {
+    'entries': EntryTable,
+    'compact': CompactTable,
+}
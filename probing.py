@@ -0,0 +1,143 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Probe sequences for the open addressing hash map. A strategy turns a key's full hash into the
+#              sequence of indices the map visits, and can tell how far along that sequence an index is.
+
+from a6_include import hash_function_2
+
+
+class ProbingStrategy:
+    """
+    Base class for probe sequences.
+    Subclasses implement probe(); distance() walks the sequence unless a subclass has a closed form.
+    """
+
+    name = None
+    # Robin Hood maps displace entries on insert and shift entries back on remove instead of leaving tombstones
+    robin_hood = False
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return self.name
+
+    def probe(self, hash: int, key: str, capacity: int, mask):
+        """Generate at most capacity indices to visit for a key. mask is set for power of two capacities."""
+        raise NotImplementedError
+
+    def distance(self, hash: int, key: str, index: int, capacity: int, mask) -> int:
+        """Return how many steps past the key's home index the given index is on its probe sequence."""
+        for steps, probed in enumerate(self.probe(hash, key, capacity, mask)):
+            if probed == index:
+                return steps
+        return capacity
+
+
+class LinearProbing(ProbingStrategy):
+    """Visit the home index and then every following index, wrapping around."""
+
+    name = 'linear'
+
+    def probe(self, hash: int, key: str, capacity: int, mask):
+        """Generate at most capacity indices to visit for a key. mask is set for power of two capacities."""
+        home = hash % capacity if mask is None else hash & mask
+        for index in range(home, capacity):
+            yield index
+        for index in range(home):
+            yield index
+
+    def distance(self, hash: int, key: str, index: int, capacity: int, mask) -> int:
+        """Return how many steps past the key's home index the given index is on its probe sequence."""
+        home = hash % capacity if mask is None else hash & mask
+        return (index - home) % capacity
+
+
+class QuadraticProbing(ProbingStrategy):
+    """
+    Visit hash + j ** 2 for j = 0, 1, 2, ...
+    Power of two tables use triangular steps (j ** 2 + j) / 2 instead, which visit every index.
+    """
+
+    name = 'quadratic'
+
+    def probe(self, hash: int, key: str, capacity: int, mask):
+        """Generate at most capacity indices to visit for a key. mask is set for power of two capacities."""
+        if mask is None:
+            for j in range(capacity):
+                yield (hash + j * j) % capacity
+        else:
+            for j in range(capacity):
+                yield (hash + (j * j + j) // 2) & mask
+
+    def distance(self, hash: int, key: str, index: int, capacity: int, mask) -> int:
+        """Return how many steps past the key's home index the given index is on its probe sequence."""
+        # walks the sequence like the base class, without a generator
+        if mask is None:
+            for j in range(capacity):
+                if (hash + j * j) % capacity == index:
+                    return j
+        else:
+            for j in range(capacity):
+                if (hash + (j * j + j) // 2) & mask == index:
+                    return j
+        return capacity
+
+
+class DoubleHashing(ProbingStrategy):
+    """
+    Visit hash + j * step, where the step comes from a second hash function (hash_function_2 by default).
+    The step is kept in [1, capacity - 1] for prime tables and odd for power of two tables,
+    so the sequence visits every index.
+    """
+
+    name = 'double'
+
+    def __init__(self, step_function: callable = hash_function_2) -> None:
+        """Initialize the strategy with the hash function used for the step size."""
+        self.step_function = step_function
+
+    def probe(self, hash: int, key: str, capacity: int, mask):
+        """Generate at most capacity indices to visit for a key. mask is set for power of two capacities."""
+        if mask is None:
+            step = self.step_function(key) % (capacity - 1) + 1 if capacity > 1 else 1
+            for j in range(capacity):
+                yield (hash + j * step) % capacity
+        else:
+            step = self.step_function(key) | 1
+            for j in range(capacity):
+                yield (hash + j * step) & mask
+
+    def distance(self, hash: int, key: str, index: int, capacity: int, mask) -> int:
+        """Return how many steps past the key's home index the given index is on its probe sequence."""
+        if mask is None:
+            step = self.step_function(key) % (capacity - 1) + 1 if capacity > 1 else 1
+        else:
+            step = self.step_function(key) | 1
+        # index = hash + j * step modulo the capacity, and the step is invertible since it is coprime to the capacity
+        return (index - hash) * pow(step, -1, capacity) % capacity
+
+
+class RobinHoodProbing(LinearProbing):
+    """
+    Linear probing with Robin Hood insertion: an entry further from its home index takes the slot of one closer
+    to its own. Removal shifts the following entries back, so the table never holds tombstones.
+    """
+
+    name = 'robin_hood'
+    robin_hood = True
+
+
+PROBING = {
+    'linear': LinearProbing,
+    'quadratic': QuadraticProbing,
+    'double': DoubleHashing,
+    'robin_hood': RobinHoodProbing,
+}
+
+
+def get_strategy(probing) -> ProbingStrategy:
+    """Return a strategy given one of the PROBING names or a ProbingStrategy instance."""
+    if isinstance(probing, ProbingStrategy):
+        return probing
+    if probing not in PROBING:
+        raise ValueError(f"unknown probing strategy {probing!r}, expected one of {tuple(PROBING)}")
+    return PROBING[probing]()
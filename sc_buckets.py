@@ -0,0 +1,441 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Alternative bucket structures for the separate chaining hash map. TreeBucket is an AVL tree ordered by
+#              (hash, key) with the same methods the hash map uses on a LinkedList, so long chains can be swapped for
+#              it to keep lookups at O(log n) per bucket. ArrayBucket is a compact chain kept in one flat list, and
+#              EMPTY_BUCKET stands in for every bucket that has never held a key.
+
+from a6_include import LinkedList, SLNode
+
+
+class TreeNode(SLNode):
+    """
+    AVL tree node for use in a TreeBucket. Keeps the key, value and hash of an SLNode.
+    """
+
+    def __init__(self, key: str, value: object, hash: int) -> None:
+        """Initialize a leaf node given a key, value and the key's full hash."""
+        super().__init__(key, value, None, hash)
+        self.left = None
+        self.right = None
+        self.height = 1
+
+
+def _height(node: TreeNode) -> int:
+    """Return the height of a subtree, 0 if it is empty."""
+    return node.height if node else 0
+
+
+def _update(node: TreeNode) -> None:
+    """Recompute the height of a node from its children."""
+    node.height = 1 + max(_height(node.left), _height(node.right))
+
+
+def _rotate_right(node: TreeNode) -> TreeNode:
+    """Rotate a subtree right and return its new root."""
+    root = node.left
+    node.left = root.right
+    root.right = node
+    _update(node)
+    _update(root)
+    return root
+
+
+def _rotate_left(node: TreeNode) -> TreeNode:
+    """Rotate a subtree left and return its new root."""
+    root = node.right
+    node.right = root.left
+    root.left = node
+    _update(node)
+    _update(root)
+    return root
+
+
+def _rebalance(node: TreeNode) -> TreeNode:
+    """Restore the AVL balance of a subtree whose children are balanced and return its new root."""
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+def _insert(node: TreeNode, new: TreeNode) -> TreeNode:
+    """Insert a node into a subtree and return the subtree's new root."""
+    if node is None:
+        return new
+    if (new.hash, new.key) < (node.hash, node.key):
+        node.left = _insert(node.left, new)
+    else:
+        node.right = _insert(node.right, new)
+    return _rebalance(node)
+
+
+def _build(nodes: list, start: int, end: int) -> TreeNode:
+    """Link the sorted nodes[start:end] into a balanced subtree and return its root."""
+    if start >= end:
+        return None
+    middle = (start + end) // 2
+    node = nodes[middle]
+    node.left = _build(nodes, start, middle)
+    node.right = _build(nodes, middle + 1, end)
+    _update(node)
+    return node
+
+
+def _pop_smallest(node: TreeNode) -> (TreeNode, TreeNode):
+    """Detach the smallest node of a subtree. Return (the subtree's new root, the detached node)."""
+    if node.left is None:
+        return node.right, node
+    node.left, smallest = _pop_smallest(node.left)
+    return _rebalance(node), smallest
+
+
+def _remove(node: TreeNode, key: str, hash: int) -> (TreeNode, TreeNode):
+    """Remove the node with a matching key from a subtree. Return (the subtree's new root, the removed node or None)."""
+    if node is None:
+        return None, None
+    if (hash, key) < (node.hash, node.key):
+        node.left, removed = _remove(node.left, key, hash)
+    elif (hash, key) > (node.hash, node.key):
+        node.right, removed = _remove(node.right, key, hash)
+    else:
+        if node.left is None:
+            return node.right, node
+        if node.right is None:
+            return node.left, node
+        # replace the node with its in-order successor
+        right, successor = _pop_smallest(node.right)
+        successor.left, successor.right = node.left, right
+        return _rebalance(successor), node
+    return _rebalance(node), removed
+
+
+class TreeBucket:
+    """
+    Balanced search tree bucket, ordered by (hash, key).
+    Supported methods are: insert, put, update, remove, pop, contains, find, items, entries, length, iterator (the
+    same as LinkedList).
+    Unlike LinkedList, a hash must always be given.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tree; keeps track of its size in a variable."""
+        self._root = None
+        self._size = 0
+
+    @classmethod
+    def from_nodes(cls, nodes) -> "TreeBucket":
+        """
+        Build a tree holding the keys, values and hashes of an iterable of nodes (such as a LinkedList). The nodes
+        are sorted once and the tree is built balanced from the middle out, without any rotations.
+        """
+        tree = cls()
+        ordered = sorted((TreeNode(node.key, node.value, node.hash) for node in nodes),
+                         key=lambda node: (node.hash, node.key))
+        tree._root = _build(ordered, 0, len(ordered))
+        tree._size = len(ordered)
+        return tree
+
+    def to_linked_list(self) -> LinkedList:
+        """Return a LinkedList holding the same keys, values and hashes."""
+        llist = LinkedList()
+        for node in self:
+            llist.insert(node.key, node.value, node.hash)
+        return llist
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'TREE [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Return a generator over the nodes, in (hash, key) order."""
+        stack, node = [], self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def insert(self, key: str, value: object, hash: int) -> None:
+        """Insert a new node; like LinkedList.insert, the key must not already be in the tree."""
+        self._root = _insert(self._root, TreeNode(key, value, hash))
+        self._size += 1
+
+    def put(self, key: str, value: object, hash: int) -> bool:
+        """
+        Update the value of the node with matching key, or insert a new node if there is none.
+        Return True if a node was inserted, False if one was updated.
+        """
+        node = self.contains(key, hash)
+        if node is None:
+            self.insert(key, value, hash)
+            return True
+        node.value = value
+        return False
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove the node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        return self.pop(key, hash) is not None
+
+    def pop(self, key: str, hash: int) -> TreeNode:
+        """Remove the node with matching key and return it, or None if no match."""
+        self._root, removed = _remove(self._root, key, hash)
+        if removed is not None:
+            self._size -= 1
+        return removed
+
+    def update(self, key: str, function: callable, hash: int) -> (object, bool):
+        """
+        Replace the value of the node with matching key by function(value). If there is none, insert a node holding
+        function(None) unless that is None.
+        Return (the new value, True if the key was already in the tree).
+        """
+        node = self.contains(key, hash)
+        if node is not None:
+            node.value = function(node.value)
+            return node.value, True
+        value = function(None)
+        if value is not None:
+            self.insert(key, value, hash)
+        return value, False
+
+    def contains(self, key: str, hash: int) -> TreeNode:
+        """Return node with matching key, or None if no match."""
+        node, target = self._root, (hash, key)
+        while node:
+            if node.hash == hash and node.key == key:
+                return node
+            node = node.left if target < (node.hash, node.key) else node.right
+        return None
+
+    def find(self, key: str, hash: int, reorder: str = None) -> (TreeNode, int):
+        """
+        Return (node with matching key or None, number of nodes compared).
+        The tree keeps its order, so reorder is accepted for compatibility with LinkedList.find and ignored.
+        """
+        node, target = self._root, (hash, key)
+        comparisons = 0
+        while node:
+            comparisons += 1
+            if node.hash == hash and node.key == key:
+                return node, comparisons
+            node = node.left if target < (node.hash, node.key) else node.right
+        return None, comparisons
+
+    def items(self):
+        """Return a generator over the (key, value) tuples, in (hash, key) order."""
+        return ((node.key, node.value) for node in self)
+
+    def entries(self):
+        """Return a generator over the (key, value, hash) tuples, in (hash, key) order."""
+        return ((node.key, node.value, node.hash) for node in self)
+
+    def length(self) -> int:
+        """Return the number of nodes in the tree."""
+        return self._size
+
+
+class ArrayBucket:
+    """
+    Compact chain that keeps a bucket's entries inline in one flat list of [key, hash, value, key, hash, value, ...]
+    instead of one SLNode per entry.
+    Supported methods are: insert, put, update, remove, pop, contains, find, items, entries, length, iterator (the
+    same as LinkedList). Like TreeBucket, a hash must always be given.
+    The nodes returned by contains, find, pop and the iterator are copies, so values can only be changed through put
+    and update.
+    """
+
+    __slots__ = ('_entries',)
+
+    def __init__(self) -> None:
+        """Initialize an empty chain."""
+        self._entries = []
+
+    @classmethod
+    def from_nodes(cls, nodes) -> "ArrayBucket":
+        """Build a chain holding the keys, values and hashes of an iterable of nodes (such as a TreeBucket)."""
+        bucket = cls()
+        for node in nodes:
+            bucket.insert(node.key, node.value, node.hash)
+        return bucket
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'ARRAY [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Return a generator over copies of the entries as SLNodes, in chain order."""
+        return (SLNode(key, value, None, hash) for key, value, hash in self.entries())
+
+    def _index(self, key: str, hash: int) -> int:
+        """Return the position of the key of the entry with matching key, or -1 if there is none."""
+        entries = self._entries
+        for index in range(0, len(entries), 3):
+            if entries[index + 1] == hash and entries[index] == key:
+                return index
+        return -1
+
+    def insert(self, key: str, value: object, hash: int) -> None:
+        """Add a new entry at the end of the chain; like LinkedList.insert, the key must not already be in it."""
+        self._entries += (key, hash, value)
+
+    def put(self, key: str, value: object, hash: int) -> bool:
+        """
+        Update the value of the entry with matching key, or add a new entry if there is none.
+        Return True if an entry was added, False if one was updated.
+        """
+        index = self._index(key, hash)
+        if index < 0:
+            self._entries += (key, hash, value)
+            return True
+        self._entries[index + 2] = value
+        return False
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove the entry with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        index = self._index(key, hash)
+        if index < 0:
+            return False
+        del self._entries[index:index + 3]
+        return True
+
+    def pop(self, key: str, hash: int) -> SLNode:
+        """Remove the entry with matching key and return a copy of it as an SLNode, or None if no match."""
+        index = self._index(key, hash)
+        if index < 0:
+            return None
+        node = SLNode(key, self._entries[index + 2], None, hash)
+        del self._entries[index:index + 3]
+        return node
+
+    def update(self, key: str, function: callable, hash: int) -> (object, bool):
+        """
+        Replace the value of the entry with matching key by function(value). If there is none, add an entry holding
+        function(None) unless that is None.
+        Return (the new value, True if the key was already in the chain).
+        """
+        index = self._index(key, hash)
+        if index >= 0:
+            value = self._entries[index + 2] = function(self._entries[index + 2])
+            return value, True
+        value = function(None)
+        if value is not None:
+            self._entries += (key, hash, value)
+        return value, False
+
+    def contains(self, key: str, hash: int) -> SLNode:
+        """Return a copy of the entry with matching key as an SLNode, or None if no match."""
+        index = self._index(key, hash)
+        if index < 0:
+            return None
+        return SLNode(key, self._entries[index + 2], None, hash)
+
+    def find(self, key: str, hash: int, reorder: str = None) -> (SLNode, int):
+        """
+        Return (copy of the entry with matching key or None, number of entries compared).
+        With reorder set to 'move_to_front' a found entry is moved to the start of the chain,
+        with 'transpose' it swaps places with the entry before it.
+        """
+        entries = self._entries
+        index = self._index(key, hash)
+        if index < 0:
+            return None, len(entries) // 3
+        value = entries[index + 2]
+        if index > 0 and reorder is not None:
+            target = 0 if reorder == 'move_to_front' else index - 3
+            entry = entries[index:index + 3]
+            del entries[index:index + 3]
+            entries[target:target] = entry
+        return SLNode(key, value, None, hash), index // 3 + 1
+
+    def items(self):
+        """Return an iterator over the (key, value) tuples, in chain order."""
+        entries = self._entries
+        return zip(entries[0::3], entries[2::3])
+
+    def entries(self):
+        """Return an iterator over the (key, value, hash) tuples, in chain order."""
+        entries = self._entries
+        return zip(entries[0::3], entries[2::3], entries[1::3])
+
+    def length(self) -> int:
+        """Return the number of entries in the chain."""
+        return len(self._entries) // 3
+
+
+class EmptyBucket:
+    """
+    Immutable bucket that holds no keys. Reads behave like an empty LinkedList; insert, insert_node, put and update
+    raise TypeError, since the one instance is shared by every empty bucket of every map.
+    Supported methods are: remove, pop, contains, find, items, entries, length, iterator
+    """
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output, the same as an empty LinkedList's."""
+        return "SLL []"
+
+    def __iter__(self):
+        """Return an iterator over no nodes."""
+        return iter(())
+
+    def _refuse(self, *args) -> None:
+        """Raise TypeError for any attempt to add a key."""
+        raise TypeError("the shared empty bucket cannot hold keys; replace it with a new chain first")
+
+    insert = insert_node = put = update = _refuse
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """Return False, as there is no key to remove."""
+        return False
+
+    def pop(self, key: str, hash: int = None) -> None:
+        """Return None, as there is no key to remove."""
+        return None
+
+    def contains(self, key: str, hash: int = None) -> None:
+        """Return None, as there is no node to match."""
+        return None
+
+    def find(self, key: str, hash: int = None, reorder: str = None) -> (None, int):
+        """Return (None, 0), as there is no node to compare."""
+        return None, 0
+
+    def items(self):
+        """Return an iterator over no (key, value) tuples."""
+        return iter(())
+
+    def entries(self):
+        """Return an iterator over no (key, value, hash) tuples."""
+        return iter(())
+
+    def length(self) -> int:
+        """Return 0."""
+        return 0
+
+
+# shared by every bucket that holds no keys, so empty buckets cost no allocation; the hash map replaces it with a new
+# chain before inserting
+EMPTY_BUCKET = EmptyBucket()
+
+# chain types for the separate chaining hash map
+CHAINS = {
+    'linked': LinkedList,
+    'array': ArrayBucket,
+}
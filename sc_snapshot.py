@@ -0,0 +1,159 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Binary snapshot format for the separate chaining hash map. A snapshot keeps the capacity, the hash
+#              function's registered name and every bucket's entries in chain order along with their cached hashes,
+#              so loading puts each entry straight back into its bucket without hashing a single key. Values use the
+#              same encoding as the memory-mapped open addressing tables.
+
+import mmap
+import os
+import struct
+import tempfile
+from contextlib import suppress
+
+from mapped_hash_map import ENTRY, decode_value, encode_value
+from a6_include import HASH_FUNCTIONS, hash_function_name
+
+# File layout:
+#   header    HEADER below
+#   buckets   for every bucket in index order: BUCKET (its number of entries), then one record per entry in chain
+#             order: HASH, ENTRY, the UTF-8 key and the encoded value
+MAGIC = b'CS261SC\0'
+VERSION = 1
+# magic, version, flags, 5 reserved bytes, capacity, size, hash function name, chain type
+HEADER = struct.Struct('<8sHB5xQQ32s16s')
+BUCKET = struct.Struct('<I')
+HASH = struct.Struct('<Q')
+
+# header flags
+FLAG_MASK = 1           # the capacity is a power of two and indices are taken with a mask
+
+
+def write_chains(path: str, buckets, capacity: int, size: int, function: callable, chain: str, pow2: bool) -> None:
+    """
+    Writes the buckets of a separate chaining table to a snapshot file, one bucket at a time, so a table never has
+    to be copied in memory to be saved. The file is written to a uniquely named temporary file next to the path and
+    then renamed over it, so concurrent saves never mix; a failed write removes the partly written file.
+
+    :param path: The file to write.
+    :param buckets: An iterable of exactly capacity buckets in index order. Each must have length() and iterate
+    over nodes with a key, value and hash.
+    :param capacity: The number of buckets.
+    :param size: The number of entries.
+    :param function: The table's hash function, which must be registered in HASH_FUNCTIONS.
+    :param chain: The name of the table's chain type.
+    :param pow2: True if the table takes indices with a mask instead of a modulo.
+    """
+    name = hash_function_name(function).encode()
+    # a unique temporary file, so concurrent saves to the same path cannot write over each other's
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with open(descriptor, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, FLAG_MASK if pow2 else 0, capacity, size, name, chain.encode()))
+            written = 0
+            for bucket in buckets:
+                file.write(BUCKET.pack(bucket.length()))
+                for node in bucket:
+                    encoded = node.key.encode()
+                    tag, data = encode_value(node.value)
+                    try:
+                        file.write(HASH.pack(node.hash))
+                    except struct.error:
+                        raise ValueError(f"the hash of {node.key!r} does not fit in 64 bits") from None
+                    file.write(ENTRY.pack(len(encoded), tag, len(data)))
+                    file.write(encoded)
+                    file.write(data)
+                written += 1
+            if written != capacity:
+                raise ValueError(f"expected {capacity} buckets, got {written}")
+    except BaseException:
+        # never leave a partly written file behind
+        with suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
+    os.replace(temporary, path)
+
+
+class ChainSnapshot:
+    """
+    Reader for a snapshot written by write_chains. The header is read when the snapshot is opened and exposed as
+    attributes: capacity, size, function, chain and pow2. The buckets are read from a memory mapping of the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a snapshot and read its header. Raises ValueError if the file is not a snapshot written by this version
+        or names an unknown hash function.
+        """
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a hash map snapshot")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, capacity, size, function, chain = HEADER.unpack_from(self._mmap)
+        try:
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a hash map snapshot")
+            if version != VERSION:
+                raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+            function = function.rstrip(b'\0').decode()
+            if function not in HASH_FUNCTIONS:
+                raise ValueError(f"{path} uses the unknown hash function {function!r}")
+        except ValueError:
+            self._mmap.close()
+            raise
+        self._path = path
+        self.capacity = capacity
+        self.size = size
+        self.function = HASH_FUNCTIONS[function]
+        self.chain = chain.rstrip(b'\0').decode()
+        self.pow2 = bool(flags & FLAG_MASK)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+    def __enter__(self) -> "ChainSnapshot":
+        """Return the snapshot for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmap the file at the end of a with statement."""
+        self.close()
+
+    def buckets(self):
+        """
+        Generates every bucket in index order as a list of (key, value, hash) tuples in chain order. Raises
+        ValueError if the file ends early or holds a different number of entries than its header says.
+        """
+        view = memoryview(self._mmap)
+        end, total = len(view), 0
+        try:
+            offset = HEADER.size
+            for _ in range(self.capacity):
+                self._check(offset + BUCKET.size, end)
+                count = BUCKET.unpack_from(view, offset)[0]
+                offset += BUCKET.size
+                entries = []
+                for _ in range(count):
+                    self._check(offset + HASH.size + ENTRY.size, end)
+                    hash = HASH.unpack_from(view, offset)[0]
+                    key_length, tag, value_length = ENTRY.unpack_from(view, offset + HASH.size)
+                    start = offset + HASH.size + ENTRY.size
+                    self._check(start + key_length + value_length, end)
+                    key = str(view[start:start + key_length], 'utf-8')
+                    start += key_length
+                    entries.append((key, decode_value(tag, view[start:start + value_length]), hash))
+                    offset = start + value_length
+                total += count
+                yield entries
+            if total != self.size:
+                raise ValueError(f"{self._path} holds {total} entries but its header says {self.size}")
+        finally:
+            view.release()
+
+    def _check(self, offset: int, end: int) -> None:
+        """
+        Raises ValueError if a record reaching up to the given offset does not fit in the file.
+        """
+        if offset > end:
+            raise ValueError(f"{self._path} is truncated or corrupt")
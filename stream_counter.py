@@ -0,0 +1,249 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap (Portfolio Assignment)
+# Description: Streaming frequency counter built on the separate chaining hash map. Counts values from any iterable
+#              one at a time, without materializing the stream, and reports the mode and the top-k values at any
+#              point. Exact counting keeps one counter per distinct value; the Space-Saving and Count-Min sketch modes
+#              keep a fixed number of counters and report estimates with a known error bound.
+
+import heapq
+from array import array
+from math import ceil, e
+
+from hash_map_sc import HashMap
+from a6_include import DynamicArray, hash_function_fnv1a, to_list
+
+MODES = ('exact', 'auto', 'space_saving', 'count_min')
+
+
+class StreamCounter:
+    """
+    Counts the (string) values of a stream. The mode decides how much memory it may use:
+    'exact' keeps a counter for every distinct value.
+    'auto' counts exactly until capacity distinct values have been seen, then continues as 'space_saving' from
+    those exact counts.
+    'space_saving' keeps at most capacity counters. A new value takes over the smallest counter, so every estimate
+    can be too high by at most the smallest count, which never exceeds total / capacity.
+    'count_min' keeps a width x depth Count-Min sketch (with conservative updates) for the estimates and tracks the
+    capacity values with the highest estimates as top-k candidates. Estimates are never too low, and too high by more
+    than e * total / width with a probability of at most e ** -depth.
+    """
+
+    def __init__(self, mode: str = 'exact', capacity: int = 1000, width: int = 2048, depth: int = 4,
+                 function: callable = hash_function_fnv1a) -> None:
+        """
+        Initialize an empty counter.
+
+        :param mode: One of MODES.
+        :param capacity: The most values given their own counter, for every mode but 'exact'.
+        :param width: The number of counters in each row of the Count-Min sketch.
+        :param depth: The number of rows of the Count-Min sketch.
+        :param function: The hash function for the counters' hash map and the sketch rows.
+        """
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}, expected one of {MODES}")
+        if capacity < 1 or width < 1 or depth < 1:
+            raise ValueError("capacity, width and depth must be at least 1")
+        self._mode = mode
+        self._capacity = capacity
+        self._function = function
+        self._total = 0
+        # value -> [count, error], where error is how much of the count may belong to values evicted before it
+        self._counters = HashMap(capacity if mode != 'exact' else 11, function)
+        # min-heap of (count, value) with one item per counter; a count may be stale (lower than the counter's) and
+        # is only refreshed when the item reaches the top
+        self._heap = []
+        self._width = width
+        self._depth = depth
+        self._sketch = [array('q', bytes(8 * width)) for _ in range(depth)] if mode == 'count_min' else None
+
+    def get_mode(self) -> str:
+        """
+        Return the counting mode, which changes from 'auto' to 'space_saving' once the capacity is reached
+        """
+        return self._mode
+
+    def total(self) -> int:
+        """
+        Return the number of values counted so far
+        """
+        return self._total
+
+    def add(self, value: str, count: int = 1) -> None:
+        """
+        Counts a value.
+
+        :param value: The value seen in the stream.
+        :param count: How many times it was seen.
+        """
+        self._total += count
+        if self._mode == 'count_min':
+            self._add_sketched(value, count)
+            return
+        entry = self._counters.get(value)
+        if entry is not None:
+            entry[0] += count
+        elif self._mode == 'exact' or self._counters.get_size() < self._capacity:
+            self._counters.put(value, [count, 0])
+            if self._mode == 'space_saving':
+                heapq.heappush(self._heap, (count, value))
+        else:
+            if self._mode == 'auto':
+                self._start_space_saving()
+            # the new value takes over the smallest counter
+            smallest, victim = self._pop_smallest()
+            self._counters.remove(victim)
+            self._counters.put(value, [smallest + count, smallest])
+            heapq.heappush(self._heap, (smallest + count, value))
+
+    def update(self, values) -> None:
+        """
+        Counts every value of an iterable (or DynamicArray), consuming generators lazily.
+
+        :param values: The values to count.
+        """
+        if isinstance(values, DynamicArray):
+            values = to_list(values)
+        add = self.add
+        for value in values:
+            add(value)
+
+    def _start_space_saving(self) -> None:
+        """
+        Switches an 'auto' counter that reached its capacity to Space-Saving. The exact counts become counters
+        without any error.
+        """
+        self._heap = [(entry[0], value) for value, entry in self._counters.items()]
+        heapq.heapify(self._heap)
+        self._mode = 'space_saving'
+
+    def _pop_smallest(self) -> (int, str):
+        """
+        Removes the counter with the smallest count from the heap, refreshing stale heap items on the way.
+
+        :return: A tuple (count, value) of the smallest counter. The value is still in the counters' hash map.
+        """
+        self._smallest()
+        return heapq.heappop(self._heap)
+
+    def _rows(self, value: str):
+        """
+        Returns the sketch index of a value in every row, derived from one 64 bit hash by double hashing.
+
+        :param value: The value to place.
+        """
+        hash = self._function(value)
+        first, step = hash & 0xFFFFFFFF, (hash >> 32) | 1
+        width = self._width
+        return [(first + row * step) % width for row in range(self._depth)]
+
+    def _add_sketched(self, value: str, count: int) -> None:
+        """
+        Counts a value in the Count-Min sketch and keeps the top-k candidates up to date.
+
+        :param value: The value seen in the stream.
+        :param count: How many times it was seen.
+        """
+        sketch, indices = self._sketch, self._rows(value)
+        # conservative update: only raise the counters that are below the new estimate
+        estimate = min(row[index] for row, index in zip(sketch, indices)) + count
+        for row, index in zip(sketch, indices):
+            if row[index] < estimate:
+                row[index] = estimate
+
+        entry = self._counters.get(value)
+        if entry is not None:
+            entry[0] = estimate
+        elif self._counters.get_size() < self._capacity:
+            self._counters.put(value, [estimate, 0])
+            heapq.heappush(self._heap, (estimate, value))
+        else:
+            # replace the smallest candidate if the value now has a higher estimate
+            if estimate > self._smallest():
+                self._counters.remove(heapq.heapreplace(self._heap, (estimate, value))[1])
+                self._counters.put(value, [estimate, 0])
+
+    def estimate(self, value: str) -> int:
+        """
+        Returns the (estimated) number of times a value has been seen. Estimates are never too low.
+
+        :param value: The value to look up.
+
+        :return: The count, or its upper bound for the approximate modes.
+        """
+        if self._mode == 'count_min':
+            return min(row[index] for row, index in zip(self._sketch, self._rows(value)))
+        entry = self._counters.get(value)
+        if entry is not None:
+            return entry[0]
+        # an untracked value may have been seen as often as the smallest counter
+        if self._mode == 'space_saving' and self._counters.get_size() >= self._capacity:
+            return self._smallest()
+        return 0
+
+    def _smallest(self) -> int:
+        """
+        Returns the smallest counter's count without removing it, refreshing stale heap items until the top one is
+        current.
+        """
+        heap, counters = self._heap, self._counters
+        while heap[0][0] != counters.get(heap[0][1])[0]:
+            heapq.heapreplace(heap, (counters.get(heap[0][1])[0], heap[0][1]))
+        return heap[0][0]
+
+    def max_error(self) -> int:
+        """
+        Returns how much too high any estimate can be: 0 when counting exactly, the smallest counter for
+        Space-Saving, and e * total / width for Count-Min (which holds with probability 1 - e ** -depth).
+        """
+        if self._mode == 'count_min':
+            return ceil(e * self._total / self._width)
+        if self._mode == 'space_saving' and self._counters.get_size() >= self._capacity:
+            return self._smallest()
+        return 0
+
+    def top(self, k: int) -> list:
+        """
+        Returns the k values with the highest (estimated) counts.
+
+        :param k: The number of values to report.
+
+        :return: A list of (value, count) tuples, highest count first.
+        """
+        pairs = ((value, entry[0]) for value, entry in self._counters.items())
+        return heapq.nlargest(k, pairs, key=lambda pair: pair[1])
+
+    def mode(self) -> (DynamicArray, int):
+        """
+        Finds the value(s) with the highest (estimated) count, like find_mode.
+
+        :return: A tuple (dynamic array of every value at the highest count, the highest count), or an empty array
+        and 0 before anything was counted.
+        """
+        results = DynamicArray()
+        highest = 0
+        for value, entry in self._counters.items():
+            if entry[0] > highest:
+                highest = entry[0]
+                results = DynamicArray()
+            if entry[0] == highest:
+                results.append(value)
+        return results, highest
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    def stream():
+        """A skewed stream: value i appears roughly 1 / (i + 1) as often as value 0."""
+        for step in range(1, 201):
+            for rank in range(1000):
+                if step % (rank + 1) == 0:
+                    yield 'value' + str(rank)
+
+    for mode in MODES:
+        counter = StreamCounter(mode, capacity=50, width=256, depth=4)
+        counter.update(stream())
+        modes, frequency = counter.mode()
+        print(f"{mode:<13} total: {counter.total()} mode: {modes} frequency: {frequency} top 3: {counter.top(3)} "
+              f"max error: {counter.max_error()}")